@@ -0,0 +1,200 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from importlib import metadata
+from pathlib import Path
+from pytoniq_core import Cell, Transaction
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+# pytontx lives at the repository root
+sys.path.append(str(ROOT))
+import pytontx
+
+
+def load_corpus(fixtures_dir):
+    # One corpus per fixture file: fixtures/<name>.boc -> list of Transactions
+    corpus = {}
+    for path in sorted(Path(fixtures_dir).glob('*.boc')):
+        corpus[path.stem] = [
+            Transaction.deserialize(Cell.one_from_boc(data).begin_parse())
+            for data in pytontx.iter_bocs(path)
+        ]
+    return corpus
+
+
+def percentiles(samples_ns):
+    # Nearest-rank percentiles, reported in microseconds
+    if not samples_ns:
+        return {'count': 0}
+    ordered = sorted(samples_ns)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] / 1000
+
+    return {
+        'count': len(ordered),
+        'p50_us': rank(50),
+        'p90_us': rank(90),
+        'p99_us': rank(99),
+        'max_us': ordered[-1] / 1000,
+    }
+
+
+def bench_throughput(txs, repeat, cache_size):
+    # Best-of-`repeat` decompose_tx throughput in tx/s, starting each run from
+    # empty decode and address caches
+    best = None
+    for _ in range(repeat):
+        pytontx.configure_cache(cache_size)
+        pytontx.configure_address_cache()
+        start = time.perf_counter()
+        for tx in txs:
+            pytontx.decompose_tx(tx)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(txs) / best if best else 0.0
+
+
+def bench_latency(txs):
+    # Per-call latency of the three entry points, with caching disabled
+    pytontx.configure_cache(0)
+    samples = defaultdict(list)
+    clock = time.perf_counter_ns
+
+    for tx in txs:
+        msgs = [msg for msg in [tx.in_msg, *tx.out_msgs] if msg]
+        for msg in msgs:
+            start = clock()
+            pytontx.unroll_cell(msg.body)
+            samples['unroll_cell'].append(clock() - start)
+
+            start = clock()
+            pytontx.decompose_msg(msg)
+            samples['decompose_msg'].append(clock() - start)
+
+        start = clock()
+        pytontx.decompose_tx(tx)
+        samples['decompose_tx'].append(clock() - start)
+
+    return {name: percentiles(values) for name, values in samples.items()}
+
+
+def bench_opcodes(txs):
+    # Latency of every registered decoder call, grouped by decoder name.
+    # Mirrors decode_cell_data over message bodies and transaction cells.
+    samples = defaultdict(list)
+    clock = time.perf_counter_ns
+
+    for tx in txs:
+        roots = [tx.cell] + [msg.body for msg in [tx.in_msg, *tx.out_msgs] if msg]
+        for root in roots:
+            for cell, parent, depth in pytontx.walk_cells(root):
+                slice = cell.begin_parse()
+                while len(slice.bits) >= 32:
+                    decoder = pytontx.DECODERS.get(slice.load_uint(32))
+                    if decoder is None:
+                        continue
+                    start = clock()
+                    try:
+                        decoder.decode(slice)
+                    except Exception:
+                        break
+                    samples[decoder.name].append(clock() - start)
+
+    return {name: percentiles(values) for name, values in sorted(samples.items())}
+
+
+def bench_memory(txs):
+    # Peak traced allocation while decomposing and holding the whole corpus
+    pytontx.configure_cache(0)
+    tracemalloc.start()
+    results = [pytontx.decompose_tx(tx) for tx in txs]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return peak
+
+
+def environment():
+    try:
+        revision = subprocess.run(
+            ['git', 'describe', '--always', '--dirty'],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    return {
+        'revision': revision,
+        'python': platform.python_version(),
+        'pytoniq_core': metadata.version('pytoniq_core'),
+        'platform': platform.platform(),
+        'timestamp': int(time.time()),
+    }
+
+
+def run(fixtures_dir, repeat):
+    results = {'environment': environment(), 'corpora': {}}
+    for name, txs in load_corpus(fixtures_dir).items():
+        results['corpora'][name] = {
+            'transactions': len(txs),
+            'throughput_tx_s': {
+                'cold': bench_throughput(txs, repeat, 0),
+                'cached': bench_throughput(txs, repeat, 4096),
+            },
+            'latency': bench_latency(txs),
+            'opcodes': bench_opcodes(txs),
+            'peak_memory_bytes': bench_memory(txs),
+        }
+    pytontx.configure_cache()
+    pytontx.configure_address_cache()
+    return results
+
+
+def print_summary(results, baseline=None):
+    for name, corpus in results['corpora'].items():
+        cold = corpus['throughput_tx_s']['cold']
+        line = f"{name:<28} {corpus['transactions']:>6} tx  {cold:>10.0f} tx/s cold  " \
+               f"{corpus['throughput_tx_s']['cached']:>10.0f} tx/s cached  " \
+               f"{corpus['peak_memory_bytes'] / 1024:>8.0f} KiB peak"
+        if baseline and name in baseline['corpora']:
+            before = baseline['corpora'][name]['throughput_tx_s']['cold']
+            if before:
+                line += f"  ({cold / before:.2f}x vs baseline)"
+        print(line)
+
+        for opcode, stats in corpus['opcodes'].items():
+            print(f"    {opcode:<32} n={stats['count']:<6} p50={stats['p50_us']:.1f}us "
+                  f"p90={stats['p90_us']:.1f}us p99={stats['p99_us']:.1f}us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pytontx decoding against recorded BoC fixtures")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="directory of <corpus>.boc files")
+    parser.add_argument('--repeat', type=int, default=5, help="throughput runs per corpus, the best one is kept")
+    parser.add_argument('--output', help="write machine-readable results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare throughput against")
+    args = parser.parse_args(argv)
+
+    results = run(args.fixtures, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_summary(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
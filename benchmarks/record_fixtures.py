@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import struct
+import sys
+from pathlib import Path
+from pytoniq import LiteBalancer, Address
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+async def record(name, addresses, count, min_out_msgs):
+    # Fetch the latest `count` transactions of every address and append the ones
+    # with at least `min_out_msgs` out messages to fixtures/<name>.boc
+    provider = LiteBalancer.from_mainnet_config(2)
+    await provider.start_up()
+
+    path = FIXTURES_DIR / f"{name}.boc"
+    written = 0
+    try:
+        with open(path, 'ab') as f:
+            for address in addresses:
+                txs = await provider.get_transactions(Address(address), count)
+                for tx in txs:
+                    if len(tx.out_msgs) < min_out_msgs:
+                        continue
+                    data = tx.cell.to_boc()
+                    # Length-prefixed framing, as read by pytontx.iter_bocs
+                    f.write(struct.pack('>I', len(data)) + data)
+                    written += 1
+    finally:
+        await provider.close_all()
+
+    print(f"Recorded {written} transactions into {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record mainnet transaction BoCs as benchmark fixtures")
+    parser.add_argument('name', help="corpus name, e.g. wallet_transfers, jetton_notifications, fan_out")
+    parser.add_argument('addresses', nargs='+', help="accounts whose transactions are recorded")
+    parser.add_argument('--count', type=int, default=100, help="transactions fetched per address")
+    parser.add_argument('--min-out-msgs', type=int, default=0, help="keep only transactions with this many out messages")
+    args = parser.parse_args(argv)
+
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    asyncio.run(record(args.name, args.addresses, args.count, args.min_out_msgs))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
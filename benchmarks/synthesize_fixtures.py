@@ -0,0 +1,215 @@
+import argparse
+import struct
+import sys
+from pathlib import Path
+from pytoniq_core import Address, HashMap, begin_cell
+from pytoniq_core.tlb.block import CurrencyCollection
+from pytoniq_core.tlb.transaction import ExternalMsgInfo, InternalMsgInfo
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+# Synthetic corpora built offline with begin_cell, so the opcode decoders are
+# exercised until recorded wallet, jetton and fan-out corpora exist. Every file is
+# prefixed with `synthetic_`. Transactions follow the Transaction TL-B layout
+# with a storage-only description; addresses, lts and amounts are made up.
+
+JETTON_TRANSFER = 0x0f8a7ea5
+JETTON_NOTIFICATION = 0x7362d09c
+EXCESSES = 0xd53276db
+NFT_TRANSFER = 0x5fcc3d14
+
+
+def account(n):
+    return Address((0, bytes([n]) * 32))
+
+
+def comment(text):
+    return begin_cell().store_uint(0, 32).store_snake_string(text).end_cell()
+
+
+def message_cell(src, dest, value, body, created_lt):
+    # Internal message with the body in a ref, as wallets usually send it
+    info = InternalMsgInfo(
+        ihr_disabled=True, bounce=True, bounced=False, src=src, dest=dest,
+        value=CurrencyCollection(value), ihr_fee=0, fwd_fee=0,
+        created_lt=created_lt, created_at=1700000000,
+    )
+    return (
+        begin_cell()
+        .store_cell(info.serialize())
+        .store_bit(0)  # no StateInit
+        .store_bit(1)  # body in a ref
+        .store_ref(body)
+        .end_cell()
+    )
+
+
+def external_message_cell(dest, body):
+    # External inbound message, as sent to a wallet to sign its transfers
+    return (
+        begin_cell()
+        .store_cell(ExternalMsgInfo(src=None, dest=dest, import_fee=0).serialize())
+        .store_bit(0)  # no StateInit
+        .store_bit(1)  # body in a ref
+        .store_ref(body)
+        .end_cell()
+    )
+
+
+def transaction_cell(addr, lt, in_msg, out_msgs):
+    out_dict = HashMap(
+        key_size=15,
+        map_=dict(enumerate(out_msgs)),
+        value_serializer=lambda src, dest: dest.store_ref(src),
+    ).serialize()
+    messages = begin_cell().store_maybe_ref(in_msg).store_dict(out_dict).end_cell()
+    state_update = begin_cell().store_uint(0x72, 8).store_bytes(bytes(32)).store_bytes(bytes(32)).end_cell()
+    # trans_storage$0001, no fees due, acst_unchanged
+    description = begin_cell().store_bits('0001').store_coins(0).store_bit(0).store_bit(0).end_cell()
+    return (
+        begin_cell()
+        .store_bits('0111')
+        .store_bytes(addr.hash_part)
+        .store_uint(lt, 64)
+        .store_bytes(bytes(32))
+        .store_uint(lt - 1, 64)
+        .store_uint(1700000000, 32)
+        .store_uint(len(out_msgs), 15)
+        .store_bits('10')  # orig_status: active
+        .store_bits('10')  # end_status: active
+        .store_ref(messages)
+        .store_coins(1000000).store_bit(0)  # total_fees
+        .store_ref(state_update)
+        .store_ref(description)
+        .end_cell()
+    )
+
+
+def wallet_transfers(count):
+    # A v4 wallet alternately receiving a TON transfer (with a comment, or an
+    # empty body every fourth time) and sending one or two transfers with a
+    # comment, signed in an external message
+    wallet = account(6)
+    txs = []
+    for i in range(count):
+        counterparty = account(20 + i % 5)
+        lt = 90000 + i * 10
+        if i % 2 == 0:
+            body = comment(f"deposit {i}") if i % 4 else begin_cell().end_cell()
+            txs.append(transaction_cell(
+                wallet, lt,
+                message_cell(counterparty, wallet, (i + 1) * 10**9, body, lt - 1),
+                [],
+            ))
+            continue
+        transfers = [
+            message_cell(wallet, account(30 + j), (j + 1) * 10**8, comment(f"invoice {i}-{j}"), lt + 1 + j)
+            for j in range(2 if i % 3 == 2 else 1)
+        ]
+        signed = (
+            begin_cell()
+            .store_bytes(bytes([i % 256]) * 64)  # signature
+            .store_uint(698983191, 32)  # subwallet_id
+            .store_uint(1700000060, 32)  # valid_until
+            .store_uint(i // 2, 32)  # seqno
+            .store_uint(0, 8)  # op: simple send
+        )
+        for transfer in transfers:
+            signed.store_uint(3, 8).store_ref(transfer)  # send mode
+        txs.append(transaction_cell(wallet, lt, external_message_cell(wallet, signed.end_cell()), transfers))
+    return txs
+
+
+def jetton_notifications(count):
+    # A contract receiving jetton transfer notifications with a comment as
+    # forward payload, answering each with excesses to the original sender
+    contract, jetton_wallet = account(1), account(2)
+    txs = []
+    for i in range(count):
+        sender = account(10 + i % 5)
+        notification = (
+            begin_cell()
+            .store_uint(JETTON_NOTIFICATION, 32).store_uint(i, 64)
+            .store_coins((i + 1) * 10**9)
+            .store_address(sender)
+            .store_bit(1).store_ref(comment(f"order {i}"))
+            .end_cell()
+        )
+        excesses = begin_cell().store_uint(EXCESSES, 32).store_uint(i, 64).end_cell()
+        lt = 1000 + i * 10
+        txs.append(transaction_cell(
+            contract, lt,
+            message_cell(jetton_wallet, contract, 5 * 10**7, notification, lt - 1),
+            [message_cell(contract, sender, 10**7, excesses, lt + 1)],
+        ))
+    return txs
+
+
+def fan_out(count, out_msgs):
+    # A highload wallet paying out jetton and NFT transfers. Half of the
+    # jetton transfers have no response destination (addr_none), and all of
+    # them share one forward payload cell.
+    wallet = account(3)
+    payload = comment("payout")
+    txs = []
+    for i in range(count):
+        lt = 50000 + i * 1000
+        msgs = []
+        for j in range(out_msgs):
+            recipient = account(100 + j % 100)
+            if j % 10 == 9:
+                body = (
+                    begin_cell()
+                    .store_uint(NFT_TRANSFER, 32).store_uint(j, 64)
+                    .store_address(recipient)
+                    .store_address(None)
+                    .store_maybe_ref(None)
+                    .store_coins(10**6)
+                    .store_bit(0)
+                    .end_cell()
+                )
+            else:
+                body = (
+                    begin_cell()
+                    .store_uint(JETTON_TRANSFER, 32).store_uint(j, 64)
+                    .store_coins((j + 1) * 10**8)
+                    .store_address(recipient)
+                    .store_address(wallet if j % 2 else None)
+                    .store_maybe_ref(None)
+                    .store_coins(10**6)
+                    .store_bit(1).store_ref(payload)
+                    .end_cell()
+                )
+            msgs.append(message_cell(wallet, account(4), 5 * 10**7, body, lt + 1 + j))
+        txs.append(transaction_cell(
+            wallet, lt,
+            message_cell(account(5), wallet, 10**9, comment(f"batch {i}"), lt - 1),
+            msgs,
+        ))
+    return txs
+
+
+def write_corpus(name, cells):
+    path = FIXTURES_DIR / f"synthetic_{name}.boc"
+    with open(path, 'wb') as f:
+        for cell in cells:
+            data = cell.to_boc()
+            # Length-prefixed framing, as read by pytontx.iter_bocs
+            f.write(struct.pack('>I', len(data)) + data)
+    print(f"Wrote {len(cells)} transactions into {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build synthetic transaction BoC fixtures")
+    parser.add_argument('--count', type=int, default=20, help="transactions per corpus")
+    parser.add_argument('--out-msgs', type=int, default=50, help="out messages per fan-out transaction")
+    args = parser.parse_args(argv)
+
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    write_corpus('wallet_transfers', wallet_transfers(args.count))
+    write_corpus('jetton_notifications', jetton_notifications(args.count))
+    write_corpus('fan_out', fan_out(args.count, args.out_msgs))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
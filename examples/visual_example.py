@@ -1,180 +1,199 @@
+import argparse
+import asyncio
+import sys
+from itertools import islice
+from pathlib import Path
 import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 
-def unroll_cell(cell, graph=None, parent_id=None, visited=None):
-    if graph is None:
-        graph = nx.DiGraph()
-    if visited is None:
-        visited = set()
-
-    cell_hash = cell.hash
-    cell_id = cell_hash
-
-    if cell_id in visited:
-        return graph  # Avoid duplicates
-    visited.add(cell_id)
-
-    slice = cell.begin_parse()
-    bits_left = len(slice.bits)
-
-    cell_data = {}
-    if bits_left >= 32:
-        opcode = slice.load_uint(32)
-        cell_data['opcode'] = hex(opcode)
-    else:
-        cell_data['opcode'] = 'N/A'
-
-    graph.add_node(cell_id, **cell_data)
-
-    if parent_id is not None:
-        graph.add_edge(parent_id, cell_id)
-
-    for ref in slice.refs:
-        unroll_cell(ref, graph, cell_id, visited)
-
-    return graph
-
-def decompose_message(msg):
-    return {
-        'src': msg.info.src.to_str(1, 1, 1) if msg.info.src else None,
-        'dest': msg.info.dest.to_str(1, 1, 1) if msg.info.dest else None,
-        'coins': msg.info.value.grams / 1e9 if hasattr(msg.info, 'value') else None,
-        'body': unroll_cell(msg.body) if msg.body else None  # Unroll the body cell
-    }
+# pytontx lives at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from pytoniq import LiteBalancer
+from pytoniq_core import Cell, Transaction
+from pytontx import walk_cells, format_address, iter_bocs, iter_transactions
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / 'benchmarks' / 'fixtures'
+
+class FlowGraphBuilder:
+    # Accumulates any number of transactions into one flow graph. Addresses
+    # are nodes, and each (src, dest) pair is a single edge whose `volume` and
+    # `count` add up every message sent between them. Body cells are nodes keyed
+    # by cell hash, so a cell shared by many messages is added only once.
+    # A message seen in two transactions, as an out_msg of the sender and the
+    # in_msg of the receiver, is counted once.
+
+    def __init__(self, include_bodies=True):
+        self.include_bodies = include_bodies
+        self.graph = nx.DiGraph()
+        self._cells = set()  # hashes of the body cells already in the graph
+        self._messages = set()  # keys of the messages already counted
+
+    def add_transactions(self, txs):
+        for tx in txs:
+            self.add_transaction(tx)
+        return self
+
+    def add_transaction(self, tx):
+        if tx.in_msg:
+            self.add_message(tx.in_msg, 'in_msg')
+        for out_msg in tx.out_msgs:
+            self.add_message(out_msg, 'out_msg')
+
+    def add_message(self, msg, edge_type):
+        info = msg.info
+        src = format_address(info.src) if info.src else 'External'  # For messages from external sources
+        dest = format_address(info.dest) if info.dest else 'External'  # For messages to external destinations
+        key = (src, dest, getattr(info, 'created_lt', None), msg.body.hash if msg.body else None)
+        if key in self._messages:
+            return
+        self._messages.add(key)
+
+        coins = info.value.grams / 1e9 if hasattr(info, 'value') else 0
+        for address in (src, dest):
+            if address not in self.graph:
+                self.graph.add_node(address, label=address, node_type='address')
+
+        if self.graph.has_edge(src, dest):
+            edge = self.graph[src][dest]
+            edge['volume'] += coins
+            edge['count'] += 1
+        else:
+            self.graph.add_edge(src, dest, volume=coins, count=1, edge_type=edge_type)
+
+        if self.include_bodies and msg.body:
+            self.add_body(msg.body)
+            # Connect the message destination to the body
+            self.graph.add_edge(dest, msg.body.hash, edge_type='body')
+
+    def add_body(self, cell):
+        # walk_cells skips cells already added, and every new cell links to all
+        # of its refs, so shared subtrees are linked without being walked again
+        for node, parent, depth in walk_cells(cell, visited=self._cells):
+            slice = node.begin_parse()
+            opcode = hex(slice.load_uint(32)) if len(slice.bits) >= 32 else 'N/A'
+            self.graph.add_node(node.hash, opcode=opcode, node_type='cell')
+            for ref in node.refs:
+                self.graph.add_edge(node.hash, ref.hash, edge_type='ref')
+
+    def adjacency(self):
+        # Compact export in CSR form: node i's out-edges go to
+        # indices[indptr[i]:indptr[i + 1]], with matching volume and count.
+        # Cell nodes are named by their hash in hex.
+        index = {node: i for i, node in enumerate(self.graph.nodes)}
+        nodes, node_types, indptr, indices, volume, count = [], [], [0], [], [], []
+        for node, data in self.graph.nodes(data=True):
+            nodes.append(node.hex() if isinstance(node, bytes) else node)
+            node_types.append(data.get('node_type', 'address'))
+            for target, edge in self.graph.adj[node].items():
+                indices.append(index[target])
+                volume.append(edge.get('volume', 0))
+                count.append(edge.get('count', 0))
+            indptr.append(len(indices))
+        return {
+            'nodes': nodes,
+            'node_types': node_types,
+            'indptr': indptr,
+            'indices': indices,
+            'volume': volume,
+            'count': count,
+        }
+
+    def draw(self, title="Transaction Messages Visualization"):
+        graph = self.graph
+        pos = nx.spring_layout(graph, k=10, iterations=50)
+
+        # Prepare labels and colors for nodes
+        labels = {}
+        node_colors = []
+        for node, data in graph.nodes(data=True):
+            node_type = data.get('node_type', 'address')
+            labels[node] = data.get('label', '')
+
+            # Set node colors
+            if node_type == 'address':
+                node_colors.append('lightblue')
+            else:
+                node_colors.append('lightgreen')
+
+        # Determine edge colors based on edge_type, and widths on aggregated volume
+        edge_colors = []
+        edge_widths = []
+        max_volume = max((data.get('volume', 0) for _, _, data in graph.edges(data=True)), default=0) or 1
+        for u, v, data in graph.edges(data=True):
+            edge_type = data.get('edge_type', 'other')
+            if edge_type == 'in_msg':
+                edge_colors.append('blue')    # Color for input messages
+            elif edge_type == 'out_msg':
+                edge_colors.append('green')   # Color for output messages
+            else:
+                edge_colors.append('gray')    # Default color for other edges
+            edge_widths.append(0.5 + 3 * data.get('volume', 0) / max_volume)
+
+        # Draw the nodes
+        nx.draw_networkx_nodes(graph, pos, node_size=100, node_color=node_colors)
+
+        # Draw the edges with specified colors
+        nx.draw_networkx_edges(graph, pos, arrowstyle='->', arrowsize=5, edge_color=edge_colors, width=edge_widths)
+
+        # Draw the edge labels: aggregated volume and message count
+        edge_labels = {
+            (u, v): f"{data['volume']:g} ({data['count']})"
+            for u, v, data in graph.edges(data=True) if 'volume' in data
+        }
+        nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, font_size=8)
+
+        # Draw the labels
+        nx.draw_networkx_labels(graph, pos, labels, font_size=5)
+
+        # Create custom legend handles
+        in_msg_patch = mpatches.Patch(color='blue', label='Input Message')
+        out_msg_patch = mpatches.Patch(color='green', label='Output Message')
+
+        plt.legend(handles=[in_msg_patch, out_msg_patch])
+
+        # Display the graph
+        plt.title(title)
+        plt.axis('off')
+        plt.show()
 
 def visual_msg(tx):
-    graph = nx.DiGraph()
-
-    # Process the input message
-    in_msg = tx.in_msg
-    if in_msg:
-        in_msg_data = decompose_message(in_msg)
-        src = in_msg_data['src']
-        dest = in_msg_data['dest']
-        coins = in_msg_data['coins']
-        body_graph = in_msg_data['body']
-
-        # Add nodes for src and dest
-        if src:
-            graph.add_node(src, label=src, node_type='address')
-        else:
-            src = 'External'  # For messages from external sources
-            graph.add_node(src, label=src, node_type='address')
-
-        if dest:
-            graph.add_node(dest, label=dest, node_type='address')
-
-        # Add edge from src to dest with coins and edge_type
-        edge_label = f"{coins}" if coins else "Value: Unknown"
-        graph.add_edge(src, dest, label=edge_label, edge_type='in_msg')
-
-        # If there's a body, add it to the graph
-        if body_graph:
-            # Merge the body graph into the main graph
-            # First, we need to relabel the nodes to avoid conflicts
-            mapping = {}
-            for node in body_graph.nodes():
-                mapping[node] = f"{src}->{dest}_{node}"
-            body_graph = nx.relabel_nodes(body_graph, mapping)
-
-            # Add the nodes and edges to the main graph
-            graph.add_nodes_from(body_graph.nodes(data=True))
-            graph.add_edges_from(body_graph.edges(data=True))
-
-            # Connect the message edge to the body
-            first_cell = list(body_graph.nodes())[0]
-            graph.add_edge(dest, first_cell)
-
-    # Process the output messages
-    for out_msg in tx.out_msgs:
-        out_msg_data = decompose_message(out_msg)
-        src = out_msg_data['src']
-        dest = out_msg_data['dest']
-        coins = out_msg_data['coins']
-        body_graph = out_msg_data['body']
-
-        # Add nodes for src and dest
-        if src:
-            graph.add_node(src, label=src, node_type='address')
-        if dest:
-            graph.add_node(dest, label=dest, node_type='address')
-        else:
-            dest = 'External'  # For messages to external destinations
-            graph.add_node(dest, label=dest, node_type='address')
-
-        # Add edge from src to dest with coins and edge_type
-        edge_label = f"{coins}" if coins else "Value: Unknown"
-        graph.add_edge(src, dest, label=edge_label, edge_type='out_msg')
-
-        # If there's a body, add it to the graph
-        if body_graph:
-            # Merge the body graph into the main graph
-            # First, we need to relabel the nodes to avoid conflicts
-            mapping = {}
-            for node in body_graph.nodes():
-                mapping[node] = f"{src}->{dest}_{node}"
-            body_graph = nx.relabel_nodes(body_graph, mapping)
-
-            # Add the nodes and edges to the main graph
-            graph.add_nodes_from(body_graph.nodes(data=True))
-            graph.add_edges_from(body_graph.edges(data=True))
-
-            # Connect the message edge to the body
-            first_cell = list(body_graph.nodes())[0]
-            graph.add_edge(dest, first_cell)
-
-    # Visualization
-    pos = nx.spring_layout(graph, k=10, iterations=50)
-
-    # Prepare labels and colors for nodes
-    labels = {}
-    node_colors = []
-    for node, data in graph.nodes(data=True):
-        node_type = data.get('node_type', 'address')
-        label = data.get('label', '')
-        labels[node] = label
-
-        # Set node colors
-        if node_type == 'address':
-            node_colors.append('lightblue')
-        else:
-            node_colors.append('lightgreen')
-
-    # Determine edge colors based on edge_type
-    edge_colors = []
-    for u, v, data in graph.edges(data=True):
-        edge_type = data.get('edge_type', 'other')
-        if edge_type == 'in_msg':
-            edge_colors.append('blue')    # Color for input messages
-        elif edge_type == 'out_msg':
-            edge_colors.append('green')   # Color for output messages
-        else:
-            edge_colors.append('gray')    # Default color for other edges
+    FlowGraphBuilder().add_transactions([tx]).draw()
 
-    # Draw the nodes
-    nx.draw_networkx_nodes(graph, pos, node_size=100, node_color=node_colors)
 
-    # Draw the edges with specified colors
-    nx.draw_networkx_edges(graph, pos, arrowstyle='->', arrowsize=5, edge_color=edge_colors)
+async def fetch_transactions(address, limit):
+    # Latest `limit` transactions of an account from mainnet liteservers
+    provider = LiteBalancer.from_mainnet_config(2)
+    await provider.start_up()
+    try:
+        return [tx async for tx in iter_transactions(provider, address, limit=limit)]
+    finally:
+        await provider.close_all()
 
-    # Draw the edge labels
-    edge_labels = nx.get_edge_attributes(graph, 'label')
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, font_size=8)
 
-    # Draw the labels
-    nx.draw_networkx_labels(graph, pos, labels, font_size=5)
+def load_transactions(source, limit):
+    # Transactions from a BoC file or directory, as read by pytontx.iter_bocs,
+    # or else fetched for `source` as an account address
+    if Path(source).exists():
+        return [
+            Transaction.deserialize(Cell.one_from_boc(data).begin_parse())
+            for data in islice(iter_bocs(source), limit)
+        ]
+    return asyncio.run(fetch_transactions(source, limit))
 
-    # Create custom legend handles
-    in_msg_patch = mpatches.Patch(color='blue', label='Input Message')
-    out_msg_patch = mpatches.Patch(color='green', label='Output Message')
 
-    plt.legend(handles=[in_msg_patch, out_msg_patch])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draw the flow graph of many transactions")
+    parser.add_argument('source', nargs='?', default=str(FIXTURES_DIR / 'synthetic_fan_out.boc'),
+                        help="BoC file or directory, or an account address to fetch from mainnet")
+    parser.add_argument('--limit', type=int, default=20, help="transactions to graph")
+    parser.add_argument('--no-bodies', action='store_true', help="leave body cells out of the graph")
+    args = parser.parse_args(argv)
 
-    # Display the graph
-    plt.title("Transaction Messages Visualization")
-    plt.axis('off')
-    plt.show()
+    txs = load_transactions(args.source, args.limit)
+    FlowGraphBuilder(include_bodies=not args.no_bodies).add_transactions(txs).draw(
+        title=f"Flow graph of {len(txs)} transactions")
 
 
-visual_msg(tx)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from pytoniq import LiteBalancer, BalancerError, AdnlTransportError
+
+logger = logging.getLogger(__name__)
+
+# Failures that mean the connection, not the request, is broken
+CONNECTION_ERRORS = (BalancerError, AdnlTransportError, ConnectionError, asyncio.TimeoutError)
+
+
+class SharedBalancer:
+    # One long-lived LiteBalancer for the whole app, started once from the
+    # FastAPI lifespan instead of per request. A background task health-checks
+    # it and reconnects when no peer is alive or the liteservers stop answering.
+    # `concurrency` bounds the requests in flight so they spread over the peers.
+
+    def __init__(self, trust_level=8, timeout=10, concurrency=8, health_interval=30):
+        self.trust_level = trust_level
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.health_interval = health_interval
+        self.client = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._health_task = None
+
+    async def _connect(self):
+        client = LiteBalancer.from_mainnet_config(self.trust_level, timeout=self.timeout)
+        await client.start_up()
+        return client
+
+    async def start(self):
+        self.client = await self._connect()
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        if self.client is not None:
+            await self.client.close_all()
+            self.client = None
+
+    async def reconnect(self, generation=None):
+        # Replace the balancer. Callers pass the generation they saw fail, so
+        # concurrent failures of the same balancer reconnect only once.
+        async with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            logger.warning("Reconnecting to liteservers")
+            old, self.client = self.client, await self._connect()
+            self._generation += 1
+            if old is not None:
+                try:
+                    await old.close_all()
+                except Exception as e:
+                    logger.warning("Error closing old balancer: %s", e)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            generation = self._generation
+            try:
+                if self.client.alive_peers_num == 0:
+                    raise ConnectionError("no alive liteserver peers")
+                await asyncio.wait_for(self.client.get_masterchain_info(), self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Liteserver health check failed: %s", e)
+                try:
+                    await self.reconnect(generation)
+                except Exception as e:
+                    logger.error("Reconnect failed, retrying at next health check: %s", e)
+
+    async def call(self, method, *args, **kwargs):
+        # Run `client.<method>(*args, **kwargs)` under the concurrency limit,
+        # reconnecting and retrying once on connection failures
+        async with self._semaphore:
+            generation = self._generation
+            try:
+                return await getattr(self.client, method)(*args, **kwargs)
+            except CONNECTION_ERRORS as e:
+                logger.warning("Liteserver request %s failed: %s", method, e)
+                await self.reconnect(generation)
+                return await getattr(self.client, method)(*args, **kwargs)
+
+    async def raw_get_transactions(self, *args, **kwargs):
+        # Lets pytontx.iter_transactions page through the shared balancer
+        return await self.call("raw_get_transactions", *args, **kwargs)
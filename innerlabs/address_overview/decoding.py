@@ -0,0 +1,146 @@
+import asyncio
+import itertools
+import math
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from pytoniq_core import Address, Transaction, Slice, Cell
+
+# pytontx lives at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from pytontx import DECODERS, format_address
+
+# Decoders return bounceable addresses, the overview shows transfer
+# recipients non-bounceable like the wallet addresses next to them
+NON_BOUNCEABLE_FIELDS = ("recipient",)
+
+
+def parse_transfer(cell_slice):
+    try:
+        opcode = cell_slice.load_uint(32)
+        decoder = DECODERS.get(opcode)
+        result = decoder.decode(cell_slice) if decoder is not None else None
+        if result is None:
+            return {"Type": f"Unknown ({hex(opcode)})"}
+        parsed = {"Type": decoder.name}
+        for key, value in result.items():
+            # Payload cells and slices are not JSON serializable, show their bits instead
+            if isinstance(value, (Slice, Cell)):
+                value = str(value)
+            elif key in NON_BOUNCEABLE_FIELDS and value is not None:
+                value = format_address(Address(value), (1, 1, 0))
+            parsed[key] = value
+        return parsed
+    except Exception as e:
+        return {"Error": str(e)}
+
+
+def transaction_details(transaction):
+    details = []
+
+    # Process incoming message
+    if transaction.in_msg:
+        in_msg = transaction.in_msg
+        src = format_address(in_msg.info.src, (1, 1, 0)) if in_msg.info.src else "None"
+        try:
+            cell_slice = in_msg.body.begin_parse()
+            parsed_data = parse_transfer(cell_slice)
+        except Exception as e:
+            parsed_data = {"Error": str(e)}
+        details.append({
+            "direction": "Incoming",
+            "address": src,
+            "data": parsed_data
+        })
+
+    # Process outgoing messages
+    for out_msg in transaction.out_msgs or []:
+        dest = "None"
+        try:
+            dest = format_address(out_msg.info.dest, (1, 1, 0)) if out_msg.info.dest else "None"
+            cell_slice = out_msg.body.begin_parse()
+            parsed_data = parse_transfer(cell_slice)
+        except Exception as e:
+            parsed_data = {"Error": str(e)}
+        details.append({
+            "direction": "Outgoing",
+            "address": dest,
+            "data": parsed_data
+        })
+
+    return details
+
+
+def decode_transactions(transactions):
+    return [{"lt": tx.lt, "details": transaction_details(tx)} for tx in transactions]
+
+
+def decode_bocs(bocs):
+    # Process pool entry point: transactions cross the process boundary as BoC bytes
+    return decode_transactions(Transaction.deserialize(Cell.one_from_boc(data).begin_parse()) for data in bocs)
+
+
+def _settle(future, result, error):
+    # Runs on the event loop; the request may have given up on the page
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class DecodeStage:
+    # Runs decode_transactions off the event loop. Pages go to a single decode
+    # thread: decoding is pure Python, so more threads would only contend for
+    # the GIL, and one thread keeps the pytontx caches unshared. The thread
+    # takes pages by their position in their refresh rather than in arrival
+    # order, so the first pages of a small request are not queued behind the
+    # rest of a long refresh. Once a refresh has submitted `process_threshold`
+    # transactions, its further pages are decoded on a process pool instead,
+    # so they use other cores and leave the thread to the other requests.
+
+    def __init__(self, processes=2, process_threshold=128):
+        self.process_threshold = process_threshold
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()  # ties keep arrival order
+        self._thread = threading.Thread(target=self._run, name="decode", daemon=True)
+        self._thread.start()
+        self._processes = ProcessPoolExecutor(max_workers=processes) if processes else None
+
+    def submit(self, transactions, position=0):
+        # Future of decode_transactions(transactions); `position` is how many
+        # transactions the same refresh submitted before these
+        loop = asyncio.get_running_loop()
+        if self._processes is not None and position + len(transactions) > self.process_threshold:
+            bocs = [tx.cell.to_boc() for tx in transactions]
+            return loop.run_in_executor(self._processes, decode_bocs, bocs)
+        future = loop.create_future()
+        self._queue.put((position, next(self._order), loop, future, transactions))
+        return future
+
+    def _run(self):
+        while True:
+            _, _, loop, future, transactions = self._queue.get()
+            if future is None:
+                return
+            if future.cancelled():
+                continue
+            result, error = None, None
+            try:
+                result = decode_transactions(transactions)
+            except Exception as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(_settle, future, result, error)
+            except RuntimeError:
+                # The event loop is already closed
+                pass
+
+    def close(self):
+        # Sorts after every page, so queued pages are still decoded first
+        self._queue.put((math.inf, next(self._order), None, None, None))
+        if self._processes is not None:
+            self._processes.shutdown(wait=False)
@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Backends are called synchronously. Those with `blocking = True` do I/O, so
+# async callers run them on a worker thread instead of the event loop.
+
+
+class MemoryBackend:
+    # In-process LRU cache of address histories, entries expire after `ttl` seconds
+    blocking = False
+
+    def __init__(self, maxsize=256, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if self.ttl is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+
+class SQLiteBackend:
+    # Local SQLite store, so histories survive restarts and can be shared
+    # between worker processes. Entries are stored as JSON. Calls may come
+    # from several worker threads and share one connection under a lock.
+    blocking = True
+
+    def __init__(self, path="address_history.db", ttl=None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS history (address TEXT PRIMARY KEY, updated REAL, value TEXT)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT updated, value FROM history WHERE address = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        updated, value = row
+        if self.ttl is not None and updated + self.ttl < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        data = json.dumps(value)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO history (address, updated, value) VALUES (?, ?, ?)",
+                (key, time.time(), data),
+            )
+            self._db.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM history WHERE address = ?", (key,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def count_wallets(wallets, details, contract_address, sign=1):
+    # Add (or with sign=-1 remove) the interactions of `details` to the per-wallet counts
+    for detail in details:
+        wallet = detail["address"]
+        if wallet == "None" or wallet == contract_address:
+            continue
+        counts = wallets.setdefault(wallet, {"in": 0, "out": 0})
+        counts["in" if detail["direction"] == "Incoming" else "out"] += sign
+        if counts["in"] == 0 and counts["out"] == 0:
+            del wallets[wallet]
+    return wallets
+
+
+class AddressHistory:
+    # Decoded recent history of one address: the latest `limit` transactions
+    # (newest first, each with its message details), the interacting wallet
+    # counts over them and the lt of the newest one. New transactions are
+    # merged in front and the oldest ones evicted, updating the counts as they go.
+
+    def __init__(self, contract_address, limit, last_lt=0, transactions=None, wallets=None, checked_at=0):
+        self.contract_address = contract_address
+        self.limit = limit
+        self.last_lt = last_lt
+        self.transactions = transactions or []
+        self.wallets = wallets or {}
+        self.checked_at = checked_at
+
+    @classmethod
+    def from_dict(cls, contract_address, data):
+        # merge() updates the wallet counts in place, so they are copied rather
+        # than shared with the dict a MemoryBackend keeps
+        wallets = {wallet: dict(counts) for wallet, counts in data["wallets"].items()}
+        return cls(contract_address, data["limit"], data["last_lt"], list(data["transactions"]),
+                   wallets, data["checked_at"])
+
+    def to_dict(self):
+        return {
+            "limit": self.limit,
+            "last_lt": self.last_lt,
+            "transactions": self.transactions,
+            "wallets": self.wallets,
+            "checked_at": self.checked_at,
+        }
+
+    def merge(self, new_transactions):
+        # `new_transactions` are {"lt": ..., "details": [...]}, newest first,
+        # all newer than last_lt
+        if new_transactions:
+            for tx in new_transactions:
+                count_wallets(self.wallets, tx["details"], self.contract_address)
+            self.transactions = new_transactions + self.transactions
+            self.last_lt = new_transactions[0]["lt"]
+            for tx in self.transactions[self.limit:]:
+                count_wallets(self.wallets, tx["details"], self.contract_address, -1)
+            del self.transactions[self.limit:]
+        self.checked_at = time.time()
+
+    def view(self, limit):
+        # Wallet counts and message details over the newest `limit` transactions
+        details = [detail for tx in self.transactions[:limit] for detail in tx["details"]]
+        if limit >= self.limit:
+            return dict(self.wallets), details
+        return count_wallets({}, details, self.contract_address), details
@@ -1,105 +1,264 @@
 # main.py
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Form, Query, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 import asyncio
 import json
-from pytoniq import LiteBalancer, Address
-from pytoniq_core import Transaction
+import sys
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from pytoniq import Address
 
-OPCODES = {
-    "Transfer": 0x0ec3c86d,
-}
+# pytontx lives at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from pytontx import HISTORY_PAGE_SIZE, iter_transactions
+from balancer import SharedBalancer
+from decoding import DecodeStage
+from history_cache import AddressHistory, MemoryBackend
+from singleflight import SingleFlight
 
-app = FastAPI()
+# Liteserver pool shared by all requests
+balancer = SharedBalancer(trust_level=8, concurrency=8)
+
+# Transactions shown on the dashboard unless the form asks for more, and the
+# most any request may ask for: longer histories are paged through the shared
+# balancer and kept in the cache
+HISTORY_LIMIT = 100
+MAX_HISTORY_LIMIT = 1000
+
+# Decoded histories by address, swap for SQLiteBackend("address_history.db")
+# to keep them across restarts. REFRESH_INTERVAL is the reuse window: views
+# within that many seconds of the last fetch are served without asking the
+# liteservers.
+history_cache = MemoryBackend(maxsize=256, ttl=600)
+REFRESH_INTERVAL = 5
+
+# In-flight history fetches by address, shared by concurrent requests, and
+# the feed of new transactions each one publishes for streaming requests
+refreshes = SingleFlight()
+feeds = weakref.WeakKeyDictionary()
+
+# Decoding runs off the event loop, up to DECODE_PENDING pages behind the fetch
+decoder = DecodeStage(processes=2, process_threshold=128)
+DECODE_PENDING = 4
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await balancer.start()
+    yield
+    await balancer.close()
+    decoder.close()
+
+app = FastAPI(lifespan=lifespan)
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-def parse_transfer(cell_slice):
+class TransactionFeed:
+    # New transactions decoded by one in-flight fetch. Every streaming request
+    # following the fetch gets all of them, from the first, as they arrive.
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.transactions = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, tx):
+        self.transactions.append(tx)
+        self._wake()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        # Waiters hold the old event, a new one is armed for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self):
+        sent = 0
+        while True:
+            while sent < len(self.transactions):
+                yield self.transactions[sent]
+                sent += 1
+            if self.closed:
+                return
+            await self._changed.wait()
+
+def address_key(contract_address: str):
+    # One cache and fetch key per contract whatever form it is given in,
+    # formatted like the wallet addresses in the transaction details
+    return Address(contract_address).to_str(1, 1, 0)
+
+async def call_cache(method, *args):
+    # Blocking backends such as SQLiteBackend run on a worker thread, so disk
+    # I/O never stalls the event loop
+    if history_cache.blocking:
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+    return method(*args)
+
+async def load_history(contract_address: str, limit: int):
+    # Cached history covering at least `limit` transactions, or a new empty one
+    cached = await call_cache(history_cache.get, contract_address)
+    history = AddressHistory.from_dict(contract_address, cached) if cached else None
+    if history is None or history.limit < limit:
+        history = AddressHistory(contract_address, limit)
+    return history
+
+def is_fresh(history):
+    return time.time() - history.checked_at < REFRESH_INTERVAL
+
+async def refresh_history(history):
+    # Fetch and yield the transactions newer than the last seen lt as they
+    # arrive, then merge them into the history and store it
+    address = Address(history.contract_address)
+    new_transactions = []
+    pending = deque()
+    batch = []
+    submitted = 0
+    fetched = iter_transactions(balancer, address, limit=history.limit, until_lt=history.last_lt)
+    try:
+        while True:
+            try:
+                transaction = await fetched.__anext__()
+                batch.append(transaction)
+            except StopAsyncIteration:
+                transaction = None
+            if batch and (len(batch) == HISTORY_PAGE_SIZE or transaction is None):
+                pending.append(decoder.submit(batch, submitted))
+                submitted += len(batch)
+                batch = []
+            # Yield decoded pages in order as soon as they are ready, waiting
+            # only when too many are queued or the fetch is over
+            while pending and (pending[0].done() or len(pending) > DECODE_PENDING or transaction is None):
+                for tx in await pending.popleft():
+                    new_transactions.append(tx)
+                    yield tx
+            if transaction is None:
+                break
+    finally:
+        await fetched.aclose()
+
+    history.merge(new_transactions)
+    await call_cache(history_cache.set, history.contract_address, history.to_dict())
+
+async def fetch_history(contract_address: str, limit: int, feed: TransactionFeed):
+    history = await load_history(contract_address, limit)
+    try:
+        if not is_fresh(history):
+            async for tx in refresh_history(history):
+                feed.publish(tx)
+    finally:
+        feed.close()
+    return history
+
+def start_fetch(contract_address: str, limit: int):
+    # The fetch of an address in flight, or a new one, with its feed
+    task = refreshes.running(contract_address)
+    if task is None:
+        feed = TransactionFeed(limit)
+        task = refreshes.start(contract_address, fetch_history, contract_address, limit, feed)
+        feeds[task] = feed
+    return task, feeds[task]
+
+async def join_fetch(contract_address: str, limit: int):
+    # Concurrent lookups of an address share one fetch. One that needs a longer
+    # history than the fetch in flight waits for it, then fetches the rest.
+    while True:
+        task, feed = start_fetch(contract_address, limit)
+        if feed.limit >= limit:
+            return task, feed
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            pass
+
+async def get_history(contract_address: str, limit: int):
+    task, _ = await join_fetch(address_key(contract_address), limit)
+    return await asyncio.shield(task)
+
+async def get_interacting_wallets(contract_address: str, limit: int = HISTORY_LIMIT):
+    # Serve from the history cache, fetching only transactions newer than the
+    # last seen lt. A cached history shorter than `limit` is fetched again in full.
+    history = await get_history(contract_address, limit)
+    return history.view(limit)
+
+async def stream_history(contract_address: str, limit: int):
+    # Events for the streaming endpoint: new transactions as each page arrives,
+    # then the cached older ones, then the wallet counts over all of them.
+    # The fetch is shared with every other request for the address, a stream
+    # joining it late first gets the transactions it already published.
+    task, feed = await join_fetch(address_key(contract_address), limit)
+    new = 0
+    async for tx in feed.follow():
+        if new < limit:
+            yield "transaction", tx
+        new += 1
+    history = await asyncio.shield(task)
+    for tx in history.transactions[new:limit]:
+        yield "transaction", tx
+    wallets, _ = history.view(limit)
+    yield "wallets", wallets
+
+def check_address(contract_address: str):
     try:
-        opcode = cell_slice.load_uint(32)
-        query_id = cell_slice.load_uint(64)
-        amount = cell_slice.load_coins()
-        recipient = cell_slice.load_address()
-        return {
-            "Type": "Transfer" if opcode == OPCODES["Transfer"] else f"Unknown ({hex(opcode)})",
-            "Query ID": query_id,
-            "Amount": amount,
-            "Recipient": recipient.to_str(1, 1, 0) if recipient else "None"
-        }
+        Address(contract_address)
     except Exception as e:
-        return {"Error": str(e)}
-
-async def get_interacting_wallets(contract_address: str):
-    async with LiteBalancer.from_mainnet_config(8) as client:
-        address = Address(contract_address)
-        transactions = await client.get_transactions(address=address, count=10)
-
-        interacting_wallets = {}
-        transaction_details = []
-
-        for transaction in transactions:
-            # Process incoming message
-            if transaction.in_msg:
-                in_msg = transaction.in_msg
-                src = in_msg.info.src.to_str(1, 1, 0) if in_msg.info.src else "None"
-                if src != "None" and src != contract_address:
-                    if src not in interacting_wallets:
-                        interacting_wallets[src] = {"in": 0, "out": 0}
-                    interacting_wallets[src]["in"] += 1
-
-                try:
-                    cell_slice = in_msg.body.begin_parse()
-                    parsed_data = parse_transfer(cell_slice)
-                    transaction_details.append({
-                        "direction": "Incoming",
-                        "address": src,
-                        "data": parsed_data
-                    })
-                except Exception as e:
-                    transaction_details.append({
-                        "direction": "Incoming",
-                        "address": src,
-                        "data": {"Error": str(e)}
-                    })
-
-            # Process outgoing messages
-            if transaction.out_msgs:
-                for out_msg in transaction.out_msgs:
-                    try:
-                        dest = out_msg.info.dest.to_str(1, 1, 0) if out_msg.info.dest else "None"
-                        if dest != "None" and dest != contract_address:
-                            if dest not in interacting_wallets:
-                                interacting_wallets[dest] = {"in": 0, "out": 0}
-                            interacting_wallets[dest]["out"] += 1
-
-                        cell_slice = out_msg.body.begin_parse()
-                        parsed_data = parse_transfer(cell_slice)
-                        transaction_details.append({
-                            "direction": "Outgoing",
-                            "address": dest,
-                            "data": parsed_data
-                        })
-                    except Exception as e:
-                        transaction_details.append({
-                            "direction": "Outgoing",
-                            "address": dest,
-                            "data": {"Error": str(e)}
-                        })
-
-        return interacting_wallets, transaction_details
+        raise HTTPException(status_code=400, detail=f"Invalid address: {e}")
 
 @app.get("/", response_class=HTMLResponse)
 async def read_index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.post("/dashboard", response_class=HTMLResponse)
-async def show_dashboard(request: Request, contract_address: str = Form(...)):
-    wallets, transaction_details = await get_interacting_wallets(contract_address)
+async def show_dashboard(request: Request, contract_address: str = Form(...), limit: int = Form(HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT)):
+    wallets, transaction_details = await get_interacting_wallets(contract_address, limit)
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
         "contract_address": contract_address,
         "wallets": wallets,
         "transaction_details": transaction_details
-    })
\ No newline at end of file
+    })
+
+@app.post("/live", response_class=HTMLResponse)
+async def show_live_dashboard(request: Request, contract_address: str = Form(...), limit: int = Form(HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT)):
+    # Same view as /dashboard, rendered in the browser from the stream endpoint
+    return templates.TemplateResponse("live.html", {
+        "request": request,
+        "contract_address": contract_address,
+        "limit": limit
+    })
+
+@app.get("/api/address/{contract_address}/wallets")
+async def api_wallets(contract_address: str, limit: int = Query(HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT)):
+    check_address(contract_address)
+    wallets, _ = await get_interacting_wallets(contract_address, limit)
+    return {"contract_address": contract_address, "wallets": wallets}
+
+@app.get("/api/address/{contract_address}/transactions")
+async def api_transactions(contract_address: str, limit: int = Query(HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT)):
+    check_address(contract_address)
+    _, transaction_details = await get_interacting_wallets(contract_address, limit)
+    return {"contract_address": contract_address, "transactions": transaction_details}
+
+@app.get("/api/address/{contract_address}/stream")
+async def api_stream(contract_address: str, limit: int = Query(HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT),
+                     format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    # One event per transaction, pushed as the liteserver pages arrive, and a
+    # final "wallets" event. NDJSON lines are {"event": ..., "data": ...}.
+    check_address(contract_address)
+
+    async def events():
+        async for event, data in stream_history(contract_address, limit):
+            if format == "sse":
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            else:
+                yield json.dumps({"event": event, "data": data}) + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
@@ -0,0 +1,29 @@
+import asyncio
+
+
+class SingleFlight:
+    # Concurrent calls for the same key share one in-flight task instead of
+    # each running their own. Callers await the task through asyncio.shield,
+    # so one that goes away does not cancel it for the others. It is forgotten
+    # as soon as it finishes: results are reused through the history cache.
+
+    def __init__(self):
+        self._tasks = {}
+
+    def running(self, key):
+        # A finished task is only dropped by its done callback, so it is checked too
+        task = self._tasks.get(key)
+        return task if task is not None and not task.done() else None
+
+    def start(self, key, fn, *args):
+        # The task in flight for `key`, or a new one running fn(*args)
+        task = self.running(key)
+        if task is None:
+            task = asyncio.create_task(fn(*args))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        return task
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
@@ -1,10 +1,9 @@
 import json
-import requests
-import pandas as pd
 import dash
 from dash import html, dash_table, dcc
 from dash.dependencies import Input, Output
-import datetime
+from exchange_client import ExchangeClient, ExchangeError
+from trade_store import TradeStore, parse_trades
 
 # User-defined parameter: Number of top tickers to process
 TOP_N_TICKERS = 91  # You can adjust this number as needed
@@ -40,6 +39,12 @@ top_tickers = [item['name'] for item in sorted_tickers[:TOP_N_TICKERS]]
 
 print(f"Top {TOP_N_TICKERS} tickers by volume: {top_tickers}")
 
+# Pooled exchange client reused by every refresh
+client = ExchangeClient()
+
+# Latest 100 trades of every ticker, kept across refreshes
+trade_store = TradeStore(capacity=100)
+
 # Initialize the Dash app
 app = dash.Dash(__name__)
 app.title = "Latest Trades Dashboard"
@@ -75,52 +80,22 @@ app.layout = html.Div([
 )
 def update_table(n):
     print("Update table called")
-    all_trades = []
-    for ticker in top_tickers:
-        url = f"https://trade.ton-rocket.com/trades/last/{ticker}?limit=100"
-        print(f"Fetching data for {ticker}")
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                response_json = response.json()
-                if response_json.get('success'):
-                    trades = response_json.get('data', [])
-                    for trade in trades:
-                        trade_data = {}
-                        trade_data['ticker'] = ticker
-                        trade_data['price'] = trade.get('price')
-                        trade_data['amount'] = trade.get('amount')
-                        trade_data['side'] = trade.get('side')
-                        if 'orderTime' in trade:
-                            # Parse orderTime from ISO 8601 format
-                            try:
-                                trade_data['timestamp'] = datetime.datetime.strptime(
-                                    trade['orderTime'], '%Y-%m-%dT%H:%M:%S.%fZ'
-                                ).strftime('%Y-%m-%d %H:%M:%S')
-                            except ValueError:
-                                # Handle cases where microseconds are missing
-                                trade_data['timestamp'] = datetime.datetime.strptime(
-                                    trade['orderTime'], '%Y-%m-%dT%H:%M:%S.%fZ'
-                                ).strftime('%Y-%m-%d %H:%M:%S')
-                        else:
-                            trade_data['timestamp'] = ''
-                        all_trades.append(trade_data)
-                else:
-                    print(f"Failed to retrieve trades for {ticker}: API returned success=false")
-            else:
-                print(f"Failed to retrieve trades for {ticker}: HTTP {response.status_code}")
-        except Exception as e:
-            print(f"Error fetching data for {ticker}: {e}")
+    for ticker, trades in client.last_trades_many(top_tickers):
+        if isinstance(trades, ExchangeError):
+            print(f"Failed to retrieve trades for {ticker}: {trades}")
+            continue
+        if isinstance(trades, Exception):
+            print(f"Error fetching data for {ticker}: {trades}")
+            continue
+        # Parse orderTime for the whole batch at once, new trades only
+        trade_store.add(ticker, parse_trades(trades))
 
-    # Convert the list of trades to a DataFrame
-    df = pd.DataFrame(all_trades)
-    if not df.empty:
-        # Sort trades by timestamp in descending order
-        df = df.sort_values(by='timestamp', ascending=False)
-        return df.to_dict('records')
-    else:
+    # Latest trades of every ticker, sorted by timestamp in descending order
+    df = trade_store.frame()
+    if df.empty:
         print("No trade data available.")
         return []
+    return df.drop(columns=['ts']).to_dict('records')
 
 # Run the Dash app
 if __name__ == '__main__':
@@ -1,66 +1,29 @@
 import json
-import aiohttp
-import asyncio
 import pandas as pd
 import dash
-from dash import html, dash_table, dcc
-from dash.dependencies import Input, Output
-import datetime
+from dash import html, dash_table, dcc, ctx, no_update, Patch
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 from flask import Flask
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.errors import DuplicateKeyError
+from pymongo import MongoClient
 import plotly.express as px
 
-# User-defined parameter: Number of top tickers to process
-TOP_N_TICKERS = 50  # You can adjust this number as needed
-
-# MongoDB connection details
-MONGO_URI = "mongodb://localhost:27017"  # Replace with your MongoDB URI
-DATABASE_NAME = "trade_data"
-COLLECTION_NAME = "trades"
+# Trades and statistics are fetched and computed by ingest.py, which must be
+# running; the callbacks below only read the snapshot it publishes.
+from ingest import MONGO_URI, DATABASE_NAME, SNAPSHOT_COLLECTION
 
 # Connect to MongoDB
 try:
     mongo_client = MongoClient(MONGO_URI)
     db = mongo_client[DATABASE_NAME]
-    trades_collection = db[COLLECTION_NAME]
+    snapshot_collection = db[SNAPSHOT_COLLECTION]
     print("Connected to MongoDB")
 except Exception as e:
     print(f"Error connecting to MongoDB: {e}")
     exit()
 
-# Create indexes to optimize queries
-trades_collection.create_index([("ticker", ASCENDING), ("timestamp_dt", DESCENDING)], unique=True)
-
-# Load tickers and volumes from pairs_data.json
-try:
-    with open('pairs_data.json', 'r') as f:
-        data = json.load(f)
-except FileNotFoundError:
-    print("Error: 'pairs_data.json' not found.")
-    exit()
-
-# Extract the list of tickers and their volumes from the 'data' key
-try:
-    pairs = data['data']
-except KeyError:
-    print("Error: Incorrect structure in 'pairs_data.json'. Expected key 'data'.")
-    exit()
-
-# Create a list of dictionaries with 'name' and 'volume'
-tickers_with_volume = []
-for item in pairs:
-    ticker_name = item.get('name')
-    volume = item.get('quoteVolume24h', 0)  # Use 0 if 'quoteVolume24h' is missing
-    tickers_with_volume.append({'name': ticker_name, 'volume': volume})
-
-# Sort the tickers by volume in descending order
-sorted_tickers = sorted(tickers_with_volume, key=lambda x: x['volume'], reverse=True)
-
-# Select the top N tickers
-top_tickers = [item['name'] for item in sorted_tickers[:TOP_N_TICKERS]]
-
-print(f"Top {TOP_N_TICKERS} tickers by volume: {top_tickers}")
+# Columns of the trades in the snapshot; ts (epoch ns) orders the timestamp column
+TRADE_COLUMNS = ['ticker', 'price', 'amount', 'side', 'timestamp', 'ts']
 
 # Initialize the Dash app with a Flask server
 server = Flask(__name__)
@@ -87,11 +50,17 @@ app.layout = html.Div([
                 {"name": "Timestamp", "id": "timestamp"},
             ],
             data=[],
+            page_current=0,
             page_size=20,
-            sort_action='native',
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='single',
+            sort_by=[],
             style_table={'overflowX': 'auto'},
         ),
     ]),
+    dcc.Store(id='table-state'),
+    dcc.Store(id='figures-version'),
     dcc.Interval(
         id='interval-component',
         interval=60*1000,  # Update every minute (milliseconds)
@@ -99,195 +68,138 @@ app.layout = html.Div([
     )
 ])
 
-# Asynchronous function to fetch data for a single ticker
-async def fetch_ticker_data(session, ticker):
-    url = f"https://trade.ton-rocket.com/trades/last/{ticker}?limit=100"
-    print(f"Fetching data for {ticker}")
-    try:
-        async with session.get(url) as response:
-            if response.status == 200:
-                response_json = await response.json()
-                if response_json.get('success'):
-                    trades = response_json.get('data', [])
-                    trades_data = []
-                    for trade in trades:
-                        trade_data = {}
-                        trade_data['ticker'] = ticker
-                        trade_data['price'] = trade.get('price')
-                        trade_data['amount'] = trade.get('amount')
-                        trade_data['side'] = trade.get('side')
-                        if 'orderTime' in trade:
-                            # Parse orderTime from ISO 8601 format
-                            try:
-                                timestamp = datetime.datetime.strptime(
-                                    trade['orderTime'], '%Y-%m-%dT%H:%M:%S.%fZ'
-                                )
-                            except ValueError:
-                                # Handle cases where microseconds are missing
-                                timestamp = datetime.datetime.strptime(
-                                    trade['orderTime'], '%Y-%m-%dT%H:%M:%S.%fZ'
-                                )
-                            trade_data['timestamp'] = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                            # Use timestamp as datetime object for MongoDB
-                            trade_data['timestamp_dt'] = timestamp
-                        else:
-                            trade_data['timestamp'] = ''
-                            trade_data['timestamp_dt'] = None
-                        # Insert into MongoDB
-                        await insert_trade_into_db(trade_data)
-                        trades_data.append(trade_data)
-                    return trades_data
-                else:
-                    print(f"Failed to retrieve trades for {ticker}: API returned success=false")
-                    return []
-            else:
-                print(f"Failed to retrieve trades for {ticker}: HTTP {response.status}")
-                return []
-    except Exception as e:
-        print(f"Error fetching data for {ticker}: {e}")
-        return []
-
-# Function to insert trade data into MongoDB
-async def insert_trade_into_db(trade_data):
-    try:
-        # Use a unique identifier for each trade (e.g., ticker + timestamp)
-        trade_record = {
-            'ticker': trade_data['ticker'],
-            'price': trade_data['price'],
-            'amount': trade_data['amount'],
-            'side': trade_data['side'],
-            'timestamp': trade_data['timestamp'],
-            'timestamp_dt': trade_data['timestamp_dt'],
-        }
-        # Insert the trade record into the collection
-        # Use upsert to avoid duplicates
-        result = trades_collection.update_one(
-            {'ticker': trade_record['ticker'], 'timestamp': trade_record['timestamp']},
-            {'$setOnInsert': trade_record},
-            upsert=True
-        )
-        if result.upserted_id:
-            print(f"Inserted new trade for {trade_data['ticker']} at {trade_data['timestamp']}")
-    except DuplicateKeyError:
-        # Ignore duplicate entries
-        pass
-    except Exception as e:
-        print(f"Error inserting trade into MongoDB: {e}")
-
-# Asynchronous function to fetch data for all tickers
-async def fetch_all_tickers_data():
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_ticker_data(session, ticker) for ticker in top_tickers]
-        results = await asyncio.gather(*tasks)
-        # Flatten the list of lists into a single list of trades
-        all_trades = [trade for trades in results for trade in trades]
-        return all_trades
-
-# Function to compute statistics from MongoDB
-def compute_statistics():
-    now = datetime.datetime.utcnow()
-    last_24h = now - datetime.timedelta(hours=24)
-    
-    pipeline = [
-        {'$match': {'timestamp_dt': {'$gte': last_24h}, 'ticker': {'$in': top_tickers}}},
-        {'$group': {
-            '_id': '$ticker',
-            'total_volume': {'$sum': '$amount'},
-            'average_trade_size': {'$avg': '$amount'},
-            'number_of_trades': {'$sum': 1},
-            'prices': {'$push': '$price'},
-            'timestamps': {'$push': '$timestamp_dt'},
-        }},
-        {'$project': {
-            'total_volume': 1,
-            'average_trade_size': 1,
-            'number_of_trades': 1,
-            'first_price': {'$arrayElemAt': ['$prices', 0]},
-            'last_price': {'$arrayElemAt': ['$prices', -1]},
-            'first_timestamp': {'$arrayElemAt': ['$timestamps', 0]},
-            'last_timestamp': {'$arrayElemAt': ['$timestamps', -1]},
-        }},
-        {'$addFields': {
-            'price_change_percentage': {
-                '$cond': [
-                    {'$eq': ['$first_price', 0]},
-                    0,
-                    {'$multiply': [
-                        {'$divide': [
-                            {'$subtract': ['$last_price', '$first_price']},
-                            '$first_price'
-                        ]},
-                        100
-                    ]}
-                ]
-            }
-        }},
-    ]
-
-    stats = list(trades_collection.aggregate(pipeline))
-    stats_df = pd.DataFrame(stats)
-    if not stats_df.empty:
-        stats_df.rename(columns={'_id': 'ticker'}, inplace=True)
-    return stats_df
-
-# Function to update the trades table and statistics
-def update_data(n):
-    print("Update data called")
-    # Run the asynchronous function to fetch data
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    all_trades = loop.run_until_complete(fetch_all_tickers_data())
-    loop.close()
+# The snapshot published by ingest.py, with its trades as a DataFrame and the
+# chart figures, reloaded only when ingest.py publishes a new one. Viewers
+# never touch the exchange API, and share one parsed copy per snapshot.
+snapshot_cache = {'version': None, 'trades': pd.DataFrame(columns=TRADE_COLUMNS), 'stats_key': None,
+                  'figures': ({}, {}), 'sorted': {}}
+
+def build_figures(stats_df):
+    if stats_df.empty:
+        return {}, {}
+
+    # Volume Bar Chart
+    fig_volume = px.bar(
+        stats_df,
+        x='ticker',
+        y='total_volume',
+        title='Total Trading Volume (Last 24 Hours)',
+        labels={'total_volume': 'Volume', 'ticker': 'Ticker'}
+    )
 
-    # Convert the list of trades to a DataFrame
-    trades_df = pd.DataFrame(all_trades)
-    if not trades_df.empty:
-        # Sort trades by timestamp in descending order
-        trades_df = trades_df.sort_values(by='timestamp', ascending=False)
-        # Remove duplicates in the DataFrame (if any)
-        trades_df = trades_df.drop_duplicates(subset=['ticker', 'timestamp'])
+    # Price Change Bar Chart
+    fig_price_change = px.bar(
+        stats_df,
+        x='ticker',
+        y='price_change_percentage',
+        title='Price Change Percentage (Last 24 Hours)',
+        labels={'price_change_percentage': 'Price Change (%)', 'ticker': 'Ticker'}
+    )
+    return fig_volume, fig_price_change
+
+def load_snapshot():
+    global snapshot_cache
+    head = snapshot_collection.find_one({'_id': 'latest'}, {'updated_at': 1})
+    version = head['updated_at'].isoformat() if head else None
+    if version == snapshot_cache['version']:
+        return snapshot_cache
+
+    snapshot = snapshot_collection.find_one({'_id': 'latest'}) or {}
+    trades_df = pd.DataFrame(snapshot.get('trades', []), columns=TRADE_COLUMNS)
+    stats = snapshot.get('stats', [])
+    # Figures are rebuilt only when the statistics changed
+    stats_key = json.dumps(stats, sort_keys=True, default=str)
+    if stats_key == snapshot_cache['stats_key']:
+        figures = snapshot_cache['figures']
     else:
-        print("No trade data available.")
-
-    # Compute statistics
-    stats_df = compute_statistics()
-
-    return trades_df.to_dict('records') if not trades_df.empty else [], stats_df
+        figures = build_figures(pd.DataFrame(stats))
+    # Replaced as a whole, so concurrent callbacks always see a consistent snapshot
+    snapshot_cache = {'version': version, 'trades': trades_df, 'stats_key': stats_key,
+                      'figures': figures, 'sorted': {}}
+    return snapshot_cache
+
+def sorted_trades(snapshot, sort_by):
+    # Trades in the table's sort order, cached per snapshot. The snapshot is
+    # newest first, which is also the order without a sort.
+    if not sort_by:
+        return snapshot['trades']
+    column, direction = sort_by[0]['column_id'], sort_by[0]['direction']
+    key = (column, direction)
+    if key not in snapshot['sorted']:
+        snapshot['sorted'][key] = snapshot['trades'].sort_values(
+            by='ts' if column == 'timestamp' else column,
+            ascending=direction == 'asc',
+            kind='stable'
+        )
+    return snapshot['sorted'][key]
 
-# Define the callback to update the trades table and statistics
+# Update the charts only when their statistics changed
+@app.callback(
+    [Output('volume-bar-chart', 'figure'),
+     Output('price-change-bar-chart', 'figure'),
+     Output('figures-version', 'data')],
+    [Input('interval-component', 'n_intervals')],
+    [State('figures-version', 'data')]
+)
+def update_figures(n, shown_key):
+    snapshot = load_snapshot()
+    if snapshot['stats_key'] == shown_key:
+        raise PreventUpdate
+    fig_volume, fig_price_change = snapshot['figures']
+    return fig_volume, fig_price_change, snapshot['stats_key']
+
+# Serve the trades table one page at a time, sorted on the server. On a new
+# snapshot, a client looking at the newest trades only receives the rows newer
+# than the last one it has seen, prepended to its page. Tickers are polled on
+# their own schedules, so a snapshot may also bring trades older than that
+# which belong between the rows shown; the page is then sent again in full.
 @app.callback(
     [Output('trades-table', 'data'),
-     Output('volume-bar-chart', 'figure'),
-     Output('price-change-bar-chart', 'figure')],
-    [Input('interval-component', 'n_intervals')]
+     Output('trades-table', 'page_count'),
+     Output('table-state', 'data')],
+    [Input('interval-component', 'n_intervals'),
+     Input('trades-table', 'page_current'),
+     Input('trades-table', 'page_size'),
+     Input('trades-table', 'sort_by')],
+    [State('table-state', 'data')]
 )
-def update_dashboard(n):
-    trades_data, stats_df = update_data(n)
-
-    # Prepare figures
-    if not stats_df.empty:
-        # Volume Bar Chart
-        fig_volume = px.bar(
-            stats_df,
-            x='ticker',
-            y='total_volume',
-            title='Total Trading Volume (Last 24 Hours)',
-            labels={'total_volume': 'Volume', 'ticker': 'Ticker'}
-        )
-
-        # Price Change Bar Chart
-        fig_price_change = px.bar(
-            stats_df,
-            x='ticker',
-            y='price_change_percentage',
-            title='Price Change Percentage (Last 24 Hours)',
-            labels={'price_change_percentage': 'Price Change (%)', 'ticker': 'Ticker'}
-        )
-    else:
-        fig_volume = {}
-        fig_price_change = {}
-
-    return trades_data, fig_volume, fig_price_change
+def update_table(n, page_current, page_size, sort_by, table_state):
+    snapshot = load_snapshot()
+    trades_df = sorted_trades(snapshot, sort_by)
+    page_current = page_current or 0
+    page_count = max(1, -(-len(trades_df) // page_size))
+    view = [page_current, page_size, sort_by or []]
+    # Epoch-ns timestamps exceed the browser's integer precision, so the state keeps them as strings
+    newest = str(trades_df['ts'].max()) if not trades_df.empty else None
+
+    if ctx.triggered_id == 'interval-component' and table_state and table_state['view'] == view:
+        if table_state['version'] == snapshot['version']:
+            raise PreventUpdate
+        if (page_current == 0 and not sort_by and newest is not None
+                and table_state['last_ts'] is not None and table_state.get('oldest_ts') is not None):
+            last_ts, oldest_ts = int(table_state['last_ts']), int(table_state['oldest_ts'])
+            new_rows = trades_df[trades_df['ts'] > last_ts].head(page_size)
+            shown = trades_df['ts'].between(oldest_ts, last_ts).sum()
+            if len(new_rows) < page_size and shown == table_state['rows']:
+                rows = min(page_size, table_state['rows'] + len(new_rows))
+                state = {'version': snapshot['version'], 'view': view, 'last_ts': newest,
+                         'oldest_ts': str(trades_df['ts'].iloc[rows - 1]), 'rows': rows}
+                if new_rows.empty:
+                    return no_update, page_count, state
+                patch = Patch()
+                for row in reversed(new_rows.drop(columns=['ts']).to_dict('records')):
+                    patch.prepend(row)
+                # Trim the rows pushed off the end of the page
+                for _ in range(table_state['rows'] + len(new_rows) - rows):
+                    del patch[rows]
+                return patch, page_count, state
+
+    start = page_current * page_size
+    page = trades_df.iloc[start:start + page_size]
+    oldest = str(page['ts'].iloc[-1]) if not page.empty else None
+    state = {'version': snapshot['version'], 'view': view, 'last_ts': newest, 'oldest_ts': oldest,
+             'rows': len(page)}
+    return page.drop(columns=['ts']).to_dict('records'), page_count, state
 
 # Run the Dash app
 if __name__ == '__main__':
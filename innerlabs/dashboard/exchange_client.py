@@ -0,0 +1,172 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Pooled TON Rocket exchange client shared by dashboard.py (sync, requests)
+# and ingest.py (async, aiohttp). Both keep connections alive between
+# refreshes, bound the requests in flight, time out every request, retry
+# 429 and 5xx answers with jittered exponential backoff and pace requests
+# with a token bucket so a refresh never bursts past the API's rate limit.
+# aiohttp and requests are imported where used, so each dashboard only needs
+# the HTTP library of the client it uses.
+
+BASE_URL = "https://trade.ton-rocket.com"
+
+MAX_CONCURRENCY = 8  # Requests in flight at once
+REQUEST_TIMEOUT = 10  # Seconds per request
+MAX_RETRIES = 3  # Retries after the first attempt
+BACKOFF_BASE = 0.5  # Seconds, doubled on every retry
+BACKOFF_MAX = 10
+RATE_LIMIT = 10  # Requests per second, sustained
+RATE_BURST = 20  # Requests allowed back to back
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ExchangeError(Exception):
+    pass
+
+
+class TokenBucket:
+    # `rate` tokens per second up to `capacity`; reserve() takes one token and
+    # returns how long to wait before it is actually available
+
+    def __init__(self, rate=RATE_LIMIT, capacity=RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+def backoff_delay(attempt, retry_after=None):
+    # Full jitter on an exponential backoff, or the server's Retry-After if it sent one
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def trades_path(ticker, limit):
+    return f"/trades/last/{ticker}?limit={limit}"
+
+
+def unwrap_trades(response_json):
+    if not response_json.get('success'):
+        raise ExchangeError("API returned success=false")
+    return response_json.get('data', [])
+
+
+class AsyncExchangeClient:
+    # One aiohttp session for the life of the client, use as `async with`
+
+    def __init__(self, concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES,
+                 bucket=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.bucket = bucket or TokenBucket()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        import aiohttp
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, path):
+        import aiohttp
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            async with self._semaphore:
+                await asyncio.sleep(self.bucket.reserve())
+                try:
+                    async with self._session.get(BASE_URL + path) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        if response.status not in RETRY_STATUSES or attempt == self.retries:
+                            raise ExchangeError(f"HTTP {response.status}")
+                        retry_after = response.headers.get('Retry-After')
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.retries:
+                        raise ExchangeError(str(e) or type(e).__name__) from e
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+    async def last_trades(self, ticker, limit=100):
+        return unwrap_trades(await self.get_json(trades_path(ticker, limit)))
+
+
+class ExchangeClient:
+    # Blocking variant over one requests.Session; last_trades_many() runs up to
+    # `concurrency` requests at once on a thread pool
+
+    def __init__(self, concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES,
+                 bucket=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.bucket = bucket or TokenBucket()
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def get_json(self, path):
+        import requests
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            with self._semaphore:
+                time.sleep(self.bucket.reserve())
+                try:
+                    response = self._session.get(BASE_URL + path, timeout=self.timeout)
+                except requests.RequestException as e:
+                    if attempt == self.retries:
+                        raise ExchangeError(str(e)) from e
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                        raise ExchangeError(f"HTTP {response.status_code}")
+                    retry_after = response.headers.get('Retry-After')
+            time.sleep(backoff_delay(attempt, retry_after))
+
+    def last_trades(self, ticker, limit=100):
+        return unwrap_trades(self.get_json(trades_path(ticker, limit)))
+
+    def last_trades_many(self, tickers, limit=100):
+        # (ticker, trades or the exception raised) pairs in the order of `tickers`
+        def fetch(ticker):
+            try:
+                return ticker, self.last_trades(ticker, limit)
+            except Exception as e:
+                return ticker, e
+        return list(self._executor.map(fetch, tickers))
@@ -0,0 +1,291 @@
+import json
+import asyncio
+import datetime
+import pandas as pd
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from exchange_client import AsyncExchangeClient, ExchangeError
+from rollup import RollingStats
+from trade_store import TradeStore, parse_trades, select, SIDE_NAMES, DISPLAY_FORMAT
+
+# Standalone ingestion service for dashboardV2.py. It polls the exchange on
+# its own schedule from one persistent event loop, stores new trades in
+# MongoDB and publishes the latest trades and 24h statistics as a snapshot
+# document that the dashboard only reads. Run it next to the dashboard:
+#   python ingest.py
+
+# User-defined parameter: Number of top tickers to process
+TOP_N_TICKERS = 50  # You can adjust this number as needed
+
+# Seconds between two published snapshots, and the initial polling interval
+# of every ticker. Each ticker then adapts its own interval between
+# MIN_POLL_INTERVAL and MAX_POLL_INTERVAL, aiming at TARGET_NEW_TRADES
+# new trades per poll out of the TRADES_LIMIT the API returns.
+POLL_INTERVAL = 60
+MIN_POLL_INTERVAL = 10
+MAX_POLL_INTERVAL = 600
+TRADES_LIMIT = 100
+TARGET_NEW_TRADES = 50
+
+# MongoDB connection details
+MONGO_URI = "mongodb://localhost:27017"  # Replace with your MongoDB URI
+DATABASE_NAME = "trade_data"
+COLLECTION_NAME = "trades"
+SNAPSHOT_COLLECTION = "dashboard_snapshot"
+STATE_COLLECTION = "ingest_state"
+
+trades_collection = None
+snapshot_collection = None
+state_collection = None
+top_tickers = []
+
+# Per ticker: last stored orderTime and polling interval restored at startup
+watermarks = {}
+poll_intervals = {}
+
+# Latest TRADES_LIMIT trades of every ticker, served as the trades table
+trade_store = TradeStore(capacity=TRADES_LIMIT)
+
+# Trades inserted and skipped as duplicates since the last snapshot
+write_counts = {'inserted': 0, 'skipped': 0}
+
+# Per-minute OHLCV buckets of the last 24 hours, fed by every stored trade
+rolling_stats = RollingStats()
+
+def connect():
+    global trades_collection, snapshot_collection, state_collection
+    mongo_client = MongoClient(MONGO_URI)
+    db = mongo_client[DATABASE_NAME]
+    trades_collection = db[COLLECTION_NAME]
+    snapshot_collection = db[SNAPSHOT_COLLECTION]
+    state_collection = db[STATE_COLLECTION]
+    # Create indexes to optimize queries
+    trades_collection.create_index([("ticker", ASCENDING), ("timestamp_dt", DESCENDING)], unique=True)
+    print("Connected to MongoDB")
+
+def load_top_tickers(path='pairs_data.json'):
+    # Top TOP_N_TICKERS pairs by 24h quote volume from pairs_data.json
+    with open(path, 'r') as f:
+        data = json.load(f)
+    pairs = data['data']
+    tickers_with_volume = [
+        {'name': item.get('name'), 'volume': item.get('quoteVolume24h', 0)}  # Use 0 if 'quoteVolume24h' is missing
+        for item in pairs
+    ]
+    sorted_tickers = sorted(tickers_with_volume, key=lambda x: x['volume'], reverse=True)
+    return [item['name'] for item in sorted_tickers[:TOP_N_TICKERS]]
+
+# Asynchronous function to fetch the trades of a single ticker newer than its
+# watermark. Returns their columns, their MongoDB documents and the number of
+# trades the API returned.
+async def fetch_ticker_data(client, ticker):
+    watermark = watermarks.get(ticker)
+    try:
+        trades = await client.last_trades(ticker, TRADES_LIMIT)
+    except ExchangeError as e:
+        print(f"Failed to retrieve trades for {ticker}: {e}")
+        return None, [], 0
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return None, [], 0
+
+    # Parse orderTime for the whole batch at once, keep only the trades
+    # not already stored in an earlier poll
+    columns = parse_trades(trades)
+    if watermark is not None:
+        columns = select(columns, columns['ts'] > pd.Timestamp(watermark).value)
+
+    times = pd.to_datetime(columns['ts'])
+    trades_data = [
+        # Use timestamp as datetime object for MongoDB
+        {'ticker': ticker, 'price': price, 'amount': amount, 'side': side,
+         'timestamp': timestamp, 'timestamp_dt': timestamp_dt}
+        for price, amount, side, timestamp, timestamp_dt in zip(
+            columns['price'].tolist(), columns['amount'].tolist(), SIDE_NAMES[columns['side']].tolist(),
+            times.strftime(DISPLAY_FORMAT), times.to_pydatetime()
+        )
+    ]
+    return columns, trades_data, len(trades)
+
+# Function to insert a batch of trades into MongoDB with one unordered bulk
+# write. Blocking, so it runs on a worker thread. Returns (upserted, skipped,
+# stored): upserted are the batch indices of the trades this write inserted,
+# stored is how many of the batch's oldest trades are known to be in MongoDB,
+# up to the first one that failed with an error other than a duplicate.
+def write_trades(trades_data):
+    requests = [
+        # Use upsert to avoid duplicates
+        UpdateOne(
+            {'ticker': trade['ticker'], 'timestamp': trade['timestamp']},
+            {'$setOnInsert': trade},
+            upsert=True
+        )
+        for trade in trades_data
+    ]
+    stored = len(requests)
+    other_errors = []
+    try:
+        result = trades_collection.bulk_write(requests, ordered=False)
+        upserted = sorted(result.upserted_ids)
+    except BulkWriteError as e:
+        # Duplicate keys are expected and skipped, the rest of the batch is still written
+        upserted = sorted(item['index'] for item in e.details.get('upserted', []))
+        other_errors = [error for error in e.details.get('writeErrors', []) if error.get('code') != 11000]
+        if other_errors:
+            print(f"Error inserting trades into MongoDB: {other_errors[0].get('errmsg')}")
+            stored = min(error['index'] for error in other_errors)
+    return upserted, len(requests) - len(upserted) - len(other_errors), stored
+
+# Persist the watermark and polling interval of a ticker, so a restarted
+# ingester continues where it stopped
+def save_ticker_state(ticker, interval):
+    state_collection.update_one(
+        {'_id': ticker},
+        {'$set': {'last_order_time': watermarks.get(ticker), 'interval': interval}},
+        upsert=True
+    )
+
+# Next polling interval from the trade rate seen in the last poll: a page full
+# of new trades means some may have been missed, no new trades means a quiet pair
+def next_interval(interval, new_trades, returned):
+    if returned >= TRADES_LIMIT and new_trades >= returned:
+        interval = interval / 2
+    elif new_trades == 0:
+        interval = interval * 2
+    else:
+        interval = interval * TARGET_NEW_TRADES / new_trades
+    return min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, interval))
+
+# Store a batch of new trades of one ticker, fold the ones it inserted into the
+# rollup, then move its watermark and latest trades past the ones now in
+# MongoDB. Trades from the first failed write on stay above the watermark and
+# are fetched and written again next poll. Trades already stored are left out
+# of the rollup: it counted them when they were inserted, or load_state did.
+async def store_trades(ticker, columns, trades_data):
+    loop = asyncio.get_running_loop()
+    try:
+        upserted, skipped, stored = await loop.run_in_executor(None, write_trades, trades_data)
+    except PyMongoError as e:
+        # Which trades were written is unknown, so none are counted
+        print(f"Error inserting trades for {ticker} into MongoDB: {e}")
+        return
+    write_counts['inserted'] += len(upserted)
+    write_counts['skipped'] += skipped
+    for index in upserted:
+        rolling_stats.add(trades_data[index])
+    if not stored:
+        return
+    # Sorted by timestamp, the last stored one is the newest
+    watermarks[ticker] = trades_data[stored - 1]['timestamp_dt']
+    trade_store.add(ticker, select(columns, slice(0, stored)))
+
+# Poll one ticker forever on its own adaptive schedule. Errors are reported
+# and the ticker polled again later, so one ticker never stops the others.
+async def poll_ticker(client, ticker, interval):
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            columns, trades_data, returned = await fetch_ticker_data(client, ticker)
+            if trades_data:
+                await store_trades(ticker, columns, trades_data)
+            interval = next_interval(interval, len(trades_data), returned)
+        except Exception as e:
+            print(f"Error polling {ticker}: {e}")
+        try:
+            await loop.run_in_executor(None, save_ticker_state, ticker, interval)
+        except Exception as e:
+            print(f"Error saving state for {ticker}: {e}")
+        await asyncio.sleep(interval)
+
+# Rolling 24h statistics from the per-minute rollup, O(tickers)
+def compute_statistics():
+    return rolling_stats.statistics()
+
+# Write the snapshot read by the dashboard. Blocking, so it runs on a worker thread.
+def publish_snapshot(trades, stats_df):
+    snapshot_collection.replace_one(
+        {'_id': 'latest'},
+        {
+            'trades': trades,
+            'stats': stats_df.to_dict('records') if not stats_df.empty else [],
+            'updated_at': datetime.datetime.utcnow(),
+        },
+        upsert=True
+    )
+
+async def publish_forever():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        # Trades and statistics are read on the loop, which is the only writer
+        # Latest trades of every ticker, sorted by timestamp in descending order
+        trades = trade_store.frame().to_dict('records')
+        if not trades:
+            print("No trade data available.")
+
+        # Compute statistics
+        stats_df = compute_statistics()
+
+        try:
+            await loop.run_in_executor(None, publish_snapshot, trades, stats_df)
+        except Exception as e:
+            print(f"Publishing snapshot failed: {e}")
+        print(f"Inserted {write_counts['inserted']} new trades, skipped {write_counts['skipped']} duplicates")
+        write_counts['inserted'] = write_counts['skipped'] = 0
+
+async def run():
+    # Every ticker is polled on its own schedule from one event loop, sharing
+    # the exchange client's connections, concurrency limit and rate limit
+    async with AsyncExchangeClient() as client:
+        tasks = [
+            poll_ticker(client, ticker, poll_intervals.get(ticker, POLL_INTERVAL))
+            for ticker in top_tickers
+        ]
+        await asyncio.gather(publish_forever(), *tasks)
+
+def load_state():
+    # Restore watermarks and seed the rollup and latest trades of every ticker from MongoDB.
+    # Tickers without a saved watermark, e.g. in a database filled before the
+    # ingest state existed, continue after their newest stored trade.
+    for state in state_collection.find({'_id': {'$in': top_tickers}}):
+        if state.get('last_order_time'):
+            watermarks[state['_id']] = state['last_order_time']
+        if state.get('interval'):
+            poll_intervals[state['_id']] = state['interval']
+    # Rebuild the 24h rollup from the stored trades, oldest first
+    last_24h = datetime.datetime.utcnow() - rolling_stats.window
+    for trade in trades_collection.find(
+        {'timestamp_dt': {'$gte': last_24h}, 'ticker': {'$in': top_tickers}},
+        {'_id': 0, 'ticker': 1, 'price': 1, 'amount': 1, 'timestamp_dt': 1}
+    ).sort('timestamp_dt', ASCENDING):
+        rolling_stats.add(trade)
+    for ticker in top_tickers:
+        stored = list(trades_collection.find({'ticker': ticker}, {'_id': 0}).sort('timestamp_dt', DESCENDING).limit(TRADES_LIMIT))
+        if stored and ticker not in watermarks:
+            watermarks[ticker] = stored[0]['timestamp_dt']
+        trade_store.add(ticker, parse_trades(stored, 'timestamp_dt', None))
+
+def main():
+    global top_tickers
+    try:
+        connect()
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        exit()
+
+    # Load tickers and volumes from pairs_data.json
+    try:
+        top_tickers = load_top_tickers()
+    except FileNotFoundError:
+        print("Error: 'pairs_data.json' not found.")
+        exit()
+    except KeyError:
+        print("Error: Incorrect structure in 'pairs_data.json'. Expected key 'data'.")
+        exit()
+    print(f"Top {TOP_N_TICKERS} tickers by volume: {top_tickers}")
+
+    load_state()
+    asyncio.run(run())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import bisect
+import datetime
+import pandas as pd
+
+# Rolling 24h trade statistics maintained at ingest time. Trades are folded
+# into per-minute OHLCV buckets per ticker as they arrive, and running totals
+# are kept per ticker, so the statistics are read in O(tickers) instead of
+# aggregating every trade of the window on each refresh.
+
+STATS_COLUMNS = [
+    'ticker', 'total_volume', 'average_trade_size', 'number_of_trades',
+    'first_price', 'last_price', 'first_timestamp', 'last_timestamp',
+    'price_change_percentage',
+]
+
+
+class MinuteBucket:
+    __slots__ = ('open', 'high', 'low', 'close', 'volume', 'count', 'first_timestamp', 'last_timestamp')
+
+    def __init__(self, price, amount, timestamp):
+        self.open = self.high = self.low = self.close = price
+        self.volume = amount
+        self.count = 1
+        self.first_timestamp = self.last_timestamp = timestamp
+
+    def add(self, price, amount, timestamp):
+        # Trades may arrive out of order, open and close follow the timestamps
+        if timestamp < self.first_timestamp:
+            self.open, self.first_timestamp = price, timestamp
+        if timestamp >= self.last_timestamp:
+            self.close, self.last_timestamp = price, timestamp
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.volume += amount
+        self.count += 1
+
+
+class RollingStats:
+    def __init__(self, window=datetime.timedelta(hours=24)):
+        self.window = window
+        self._buckets = {}  # ticker -> {minute: MinuteBucket}
+        self._minutes = {}  # ticker -> sorted bucket minutes
+        self._totals = {}  # ticker -> [volume, count] over the window
+
+    def add(self, trade):
+        timestamp = trade.get('timestamp_dt')
+        price, amount = trade.get('price'), trade.get('amount')
+        if timestamp is None or price is None or amount is None:
+            return
+        ticker = trade['ticker']
+        price, amount = float(price), float(amount)
+        minute = timestamp.replace(second=0, microsecond=0)
+
+        buckets = self._buckets.setdefault(ticker, {})
+        bucket = buckets.get(minute)
+        if bucket is None:
+            buckets[minute] = MinuteBucket(price, amount, timestamp)
+            # Usually the newest minute, so this appends
+            bisect.insort(self._minutes.setdefault(ticker, []), minute)
+        else:
+            bucket.add(price, amount, timestamp)
+
+        totals = self._totals.setdefault(ticker, [0.0, 0])
+        totals[0] += amount
+        totals[1] += 1
+
+    def evict(self, now):
+        # Drop the buckets that left the window, subtracting them from the totals
+        start = (now - self.window).replace(second=0, microsecond=0)
+        for ticker, minutes in self._minutes.items():
+            expired = bisect.bisect_left(minutes, start)
+            if not expired:
+                continue
+            buckets, totals = self._buckets[ticker], self._totals[ticker]
+            for minute in minutes[:expired]:
+                bucket = buckets.pop(minute)
+                totals[0] -= bucket.volume
+                totals[1] -= bucket.count
+            del minutes[:expired]
+
+    def statistics(self, now=None):
+        # One row per ticker with trades in the window, as a DataFrame
+        self.evict(now or datetime.datetime.utcnow())
+        rows = []
+        for ticker, minutes in self._minutes.items():
+            if not minutes:
+                continue
+            volume, count = self._totals[ticker]
+            first = self._buckets[ticker][minutes[0]]
+            last = self._buckets[ticker][minutes[-1]]
+            rows.append({
+                'ticker': ticker,
+                'total_volume': volume,
+                'average_trade_size': volume / count,
+                'number_of_trades': count,
+                'first_price': first.open,
+                'last_price': last.close,
+                'first_timestamp': first.first_timestamp,
+                'last_timestamp': last.last_timestamp,
+                'price_change_percentage': 0 if first.open == 0 else (last.close - first.open) / first.open * 100,
+            })
+        return pd.DataFrame(rows, columns=STATS_COLUMNS)
@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Columnar in-memory trade store shared by the dashboards. Each ticker keeps
+# its latest trades in a fixed-size ring of NumPy arrays (epoch-ns timestamps,
+# float64 price and amount, int8 side code). API batches are converted a
+# column at a time with vectorized parsing instead of strptime per trade, and
+# the table is served from array slices instead of rebuilt from dicts.
+
+ORDER_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+DISPLAY_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Side codes index into SIDE_NAMES; unknown sides are -1, shown as ''
+SIDE_NAMES = np.array(['buy', 'sell', ''])
+
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+
+def parse_trades(trades, time_key='orderTime', time_format=ORDER_TIME_FORMAT):
+    # Columns of a batch of trade dicts, sorted by timestamp. Trades without a
+    # parseable timestamp are dropped, they cannot be placed in time order.
+    # time_format=None accepts datetime values, e.g. documents read back from MongoDB.
+    df = pd.DataFrame.from_records(trades, columns=['price', 'amount', 'side', time_key])
+    timestamps = pd.to_datetime(df[time_key], format=time_format, errors='coerce')
+    valid = timestamps.notna().to_numpy()
+
+    ts = timestamps.to_numpy('datetime64[ns]').view('i8')[valid]
+    side = df['side'].to_numpy()[valid]
+    columns = {
+        'ts': ts,
+        'price': pd.to_numeric(df['price'], errors='coerce').to_numpy('f8')[valid],
+        'amount': pd.to_numeric(df['amount'], errors='coerce').to_numpy('f8')[valid],
+        'side': np.where(side == 'buy', 0, np.where(side == 'sell', 1, -1)).astype('i1'),
+    }
+    order = np.argsort(ts, kind='stable')
+    return {name: values[order] for name, values in columns.items()}
+
+
+def select(columns, mask):
+    return {name: values[mask] for name, values in columns.items()}
+
+
+class TradeRing:
+    # The latest `capacity` trades of one ticker, oldest first when read
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.ts = np.empty(capacity, 'i8')
+        self.price = np.empty(capacity, 'f8')
+        self.amount = np.empty(capacity, 'f8')
+        self.side = np.empty(capacity, 'i1')
+        self._written = 0
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    @property
+    def last_ts(self):
+        return self.ts[(self._written - 1) % self.capacity] if self._written else NO_TIMESTAMP
+
+    def extend(self, columns):
+        n = len(columns['ts'])
+        skip = max(0, n - self.capacity)
+        positions = (self._written + skip + np.arange(n - skip)) % self.capacity
+        for name in ('ts', 'price', 'amount', 'side'):
+            getattr(self, name)[positions] = columns[name][skip:]
+        self._written += n
+
+    def columns(self):
+        # Chronological columns: two slices of the ring once it has wrapped
+        if self._written <= self.capacity:
+            return {name: getattr(self, name)[:self._written] for name in ('ts', 'price', 'amount', 'side')}
+        start = self._written % self.capacity
+        return {
+            name: np.concatenate((getattr(self, name)[start:], getattr(self, name)[:start]))
+            for name in ('ts', 'price', 'amount', 'side')
+        }
+
+
+class TradeStore:
+    # Dash serves callbacks from several threads, so rings are only read and
+    # written under the store's lock
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.rings = {}
+        self._lock = threading.Lock()
+
+    def add(self, ticker, columns):
+        # Append the trades newer than the ticker's latest one; returns how many
+        with self._lock:
+            ring = self.rings.get(ticker)
+            if ring is None:
+                ring = self.rings[ticker] = TradeRing(self.capacity)
+            columns = select(columns, columns['ts'] > ring.last_ts)
+            ring.extend(columns)
+        return len(columns['ts'])
+
+    def last_ts(self, ticker):
+        with self._lock:
+            ring = self.rings.get(ticker)
+            return ring.last_ts if ring is not None else NO_TIMESTAMP
+
+    def frame(self):
+        # All stored trades as a DataFrame, newest first, with the table's columns
+        tickers, parts = [], []
+        with self._lock:
+            for ticker, ring in self.rings.items():
+                if len(ring):
+                    tickers.append(np.full(len(ring), ticker, dtype=object))
+                    parts.append(ring.columns())
+            if not parts:
+                return pd.DataFrame(columns=['ticker', 'price', 'amount', 'side', 'timestamp', 'ts'])
+            # Ring columns may be views of the arrays add() writes to, so they
+            # are copied out before the lock is released
+            merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+        order = np.argsort(merged['ts'], kind='stable')[::-1]
+        ts = merged['ts'][order]
+        return pd.DataFrame({
+            'ticker': np.concatenate(tickers)[order],
+            'price': merged['price'][order],
+            'amount': merged['amount'][order],
+            'side': SIDE_NAMES[merged['side'][order]],
+            'timestamp': pd.to_datetime(ts).strftime(DISPLAY_FORMAT),
+            'ts': ts,
+        })
@@ -1,104 +1,1188 @@
 from pytoniq import Address, begin_cell, LiteBalancer, WalletV4R2, LiteClient
 from pytoniq import Contract
 from pytoniq_core import Slice, Cell, boc, MessageAny, Transaction, TransactionError, TvmBitarray
+from collections import namedtuple, OrderedDict, defaultdict, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+import heapq
+import struct
+import time
+import asyncio
 import json
+import os
 
 
 n = 2
 k = 5
 address = ''
 
-provider = LiteBalancer.from_mainnet_config(n)
-await provider.start_up()
 
-txs = await provider.get_transactions(address, k) # get transactions for wallet
+# Decoded results are slotted record classes rather than dicts: no per-record
+# __dict__, no placeholder strings, and payloads are kept as Cells instead of
+# Slices so records never hold on to parser state. Records are read-only
+# Mappings, so record['src'] and comparisons against plain dicts keep working.
+class Record(Mapping):
+    __slots__ = ()
+    _fields = ()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '_fields' not in cls.__dict__:
+            cls._fields = tuple(
+                name
+                for klass in reversed(cls.__mro__)
+                for name in klass.__dict__.get('__slots__', ())
+                if not name.startswith('_')
+            )
 
+    def __init__(self, *args):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={self[name]!r}" for name in self)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self):
+        return {name: _plain(self[name]) for name in self}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self, default=_json_default, **kwargs)
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+class PayloadRecord(Record):
+    # Base for decoded opcode payloads. `opcode` (hex string) and `name` are
+    # class attributes filled in by register_decoder, so they cost nothing per record.
+    __slots__ = ()
+    opcode = None
+    name = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = ('opcode',) + tuple(name for name in cls._fields if name != 'opcode')
+
+
+class UnknownOpcode(Record):
+    __slots__ = ('opcode',)
+    _fields = ('opcode', 'message')
+    message = 'Unknown opcode, skipping further parsing'
+
+
+class DecodeError(Record):
+    # Data matched a known opcode but does not follow its layout
+    __slots__ = ('opcode', 'error')
+
+
+class GenericPayload(Record):
+    # Wraps plain dicts returned by decoders that do not define a record class
+    __slots__ = ('opcode', 'fields')
+
+    def __init__(self, opcode, fields):
+        self.opcode = opcode
+        self.fields = fields
+
+    def __iter__(self):
+        yield 'opcode'
+        yield from self.fields
+
+    def __len__(self):
+        return len(self.fields) + 1
+
+    def __getitem__(self, key):
+        if key == 'opcode':
+            return self.opcode
+        return self.fields[key]
+
+
+# Opcode registry: maps the integer opcode to its decoder, so unroll_cell
+# does one dict lookup per cell instead of walking an if/elif chain.
+# The hex string is computed once at registration time.
+OpcodeDecoder = namedtuple('OpcodeDecoder', ['opcode', 'hex', 'name', 'decode'])
+
+DECODERS = {}
+
+
+def register_decoder(opcode, name, record=None):
+    # Decorator registering `func(slice)` for `opcode`. The slice is positioned
+    # right after the 32-bit opcode. Decoders return an instance of `record`
+    # (a PayloadRecord subclass) or a plain dict, or None when the data after
+    # the opcode does not follow the layout, which is then reported as unknown.
+    # Registering the same opcode again replaces the previous decoder.
+    def wrapper(func):
+        DECODERS[opcode] = OpcodeDecoder(opcode, hex(opcode), name, func)
+        if record is not None:
+            record.opcode = hex(opcode)
+            record.name = name
+        return func
+    return wrapper
+
+
+def load_either_payload(slice):
+    # Either X ^X: the payload is inline when the flag bit is 0, in a ref otherwise
+    if len(slice.bits) > 0 and slice.load_bit():
+        return slice.load_ref().begin_parse()
+    return slice
+
+
+def payload_cell(slice):
+    # Detach what is left of a slice as a Cell, None when nothing is left.
+    # The slice itself is not advanced.
+    if len(slice.bits) == 0 and slice.ref_offset >= len(slice.refs):
+        return None
+    return slice.to_cell()
+
+
+class JettonTransfer(PayloadRecord):
+    __slots__ = ('query_id', 'jetton_amount', 'destination', 'response_destination',
+                 'custom_payload', 'forward_ton_amount', 'forward_payload')
+
+
+@register_decoder(0x0f8a7ea5, 'jetton_transfer', JettonTransfer)
+def jetton_transfer(slice):
+    return JettonTransfer(
+        slice.load_uint(64),
+        slice.load_coins() / 1e9,
+        format_address(slice.load_address()),
+        format_address(slice.load_address()),
+        slice.load_maybe_ref(),
+        slice.load_coins() / 1e9,
+        payload_cell(load_either_payload(slice)),
+    )
+
+
+class JettonTransferNotification(PayloadRecord):
+    __slots__ = ('query_id', 'jetton_amount', 'jetton_sender', 'forward_payload')
+
+
+@register_decoder(0x7362d09c, 'jetton_transfer_notification', JettonTransferNotification)
 def jetton_transfer_notif(slice):
-    result = {}
+    # Fields missing from a truncated body are left as None
+    result = JettonTransferNotification(None, None, None, None)
 
-    # Check and skip 64 bits for the query_id
+    # Check and load the query_id
     if len(slice.bits) >= 64:
-        slice.skip_bits(64)
-        result['query'] = 'skipped 64 bits'
-    else:
-        result['query'] = 'not enough bits to skip 64'
+        result.query_id = slice.load_uint(64)
 
     # Check and load coins (jetton amount)
     if len(slice.bits) > 0:
-        jetton_amount = slice.load_coins() / 1e9
-        result['jetton_amount'] = jetton_amount
-    else:
-        result['jetton_amount'] = 'not enough bits to load jetton amount'
+        result.jetton_amount = slice.load_coins() / 1e9
 
     # Check and load sender address
     if len(slice.bits) > 0:
-        jetton_sender = slice.load_address().to_str(1, 1, 1)
-        result['jetton_sender'] = jetton_sender
-    else:
-        result['jetton_sender'] = 'not enough bits to load jetton sender'
+        result.jetton_sender = format_address(slice.load_address())
 
     # Check for and load forward payload
-    if len(slice.bits) > 0 and slice.load_bit():
-        forward_payload = slice.load_ref().begin_parse()
-    else:
-        forward_payload = slice
-    result['forward_payload'] = forward_payload
-    
+    result.forward_payload = payload_cell(load_either_payload(slice))
+
     return result
-    
 
-def unroll_cell(cell):
-    results = []
-    slice = cell.begin_parse()
-    
-    while len(slice.bits) >= 32:
-        result = {}
 
-        # Extract opcode
-        opcode = hex(slice.load_uint(32))
-        result['opcode'] = opcode
+class JettonInternalTransfer(PayloadRecord):
+    __slots__ = ('query_id', 'jetton_amount', 'from_address', 'response_address',
+                 'forward_ton_amount', 'forward_payload')
+    _fields = ('query_id', 'jetton_amount', 'from', 'response_address',
+               'forward_ton_amount', 'forward_payload')
+
+    def __getitem__(self, key):
+        return self.from_address if key == 'from' else super().__getitem__(key)
+
+
+@register_decoder(0x178d4519, 'jetton_internal_transfer', JettonInternalTransfer)
+def jetton_internal_transfer(slice):
+    return JettonInternalTransfer(
+        slice.load_uint(64),
+        slice.load_coins() / 1e9,
+        format_address(slice.load_address()),
+        format_address(slice.load_address()),
+        slice.load_coins() / 1e9,
+        payload_cell(load_either_payload(slice)),
+    )
+
+
+class Excesses(PayloadRecord):
+    __slots__ = ('query_id',)
+
+
+@register_decoder(0xd53276db, 'excesses', Excesses)
+def excesses(slice):
+    return Excesses(slice.load_uint(64))
+
+
+class JettonBurn(PayloadRecord):
+    __slots__ = ('query_id', 'jetton_amount', 'response_destination', 'custom_payload')
+
+
+@register_decoder(0x595f07bc, 'jetton_burn', JettonBurn)
+def jetton_burn(slice):
+    return JettonBurn(
+        slice.load_uint(64),
+        slice.load_coins() / 1e9,
+        format_address(slice.load_address()),
+        slice.load_maybe_ref(),
+    )
+
+
+class JettonBurnNotification(PayloadRecord):
+    __slots__ = ('query_id', 'jetton_amount', 'sender', 'response_destination')
+
+
+@register_decoder(0x7bdd97de, 'jetton_burn_notification', JettonBurnNotification)
+def jetton_burn_notif(slice):
+    return JettonBurnNotification(
+        slice.load_uint(64),
+        slice.load_coins() / 1e9,
+        format_address(slice.load_address()),
+        format_address(slice.load_address()),
+    )
+
+
+class NftTransfer(PayloadRecord):
+    __slots__ = ('query_id', 'new_owner', 'response_destination', 'custom_payload',
+                 'forward_amount', 'forward_payload')
+
+
+@register_decoder(0x5fcc3d14, 'nft_transfer', NftTransfer)
+def nft_transfer(slice):
+    return NftTransfer(
+        slice.load_uint(64),
+        format_address(slice.load_address()),
+        format_address(slice.load_address()),
+        slice.load_maybe_ref(),
+        slice.load_coins() / 1e9,
+        payload_cell(load_either_payload(slice)),
+    )
+
+
+class NftOwnershipAssigned(PayloadRecord):
+    __slots__ = ('query_id', 'prev_owner', 'forward_payload')
+
+
+@register_decoder(0x05138d91, 'nft_ownership_assigned', NftOwnershipAssigned)
+def nft_ownership_assigned(slice):
+    return NftOwnershipAssigned(
+        slice.load_uint(64),
+        format_address(slice.load_address()),
+        payload_cell(load_either_payload(slice)),
+    )
+
+
+class NftGetStaticData(PayloadRecord):
+    __slots__ = ('query_id',)
+
+
+@register_decoder(0x2fcb26a2, 'nft_get_static_data', NftGetStaticData)
+def nft_get_static_data(slice):
+    return NftGetStaticData(slice.load_uint(64))
+
+
+class NftReportStaticData(PayloadRecord):
+    __slots__ = ('query_id', 'index', 'collection')
+
+
+@register_decoder(0x8b771735, 'nft_report_static_data', NftReportStaticData)
+def nft_report_static_data(slice):
+    return NftReportStaticData(
+        slice.load_uint(64),
+        slice.load_uint(256),
+        format_address(slice.load_address()),
+    )
+
+
+class TextComment(PayloadRecord):
+    __slots__ = ('comment',)
+
+
+@register_decoder(0x00000000, 'text_comment', TextComment)
+def text_comment(slice):
+    # Zero words are common in non-message data such as state hashes, so only
+    # byte-aligned UTF-8 text without control characters counts as a comment
+    if slice.remaining_bits % 8 or slice.remaining_refs > 1:
+        return None
+    try:
+        text = slice.load_snake_bytes().decode()
+    except (AssertionError, UnicodeDecodeError):
+        return None
+    if any(char < ' ' and char not in '\t\n\r' for char in text):
+        return None
+    return TextComment(text)
+
+
+class WalletPluginRequestFunds(PayloadRecord):
+    __slots__ = ('query_id', 'amount')
+
+
+@register_decoder(0x706c7567, 'wallet_plugin_request_funds', WalletPluginRequestFunds)
+def wallet_plugin_request_funds(slice):
+    return WalletPluginRequestFunds(
+        slice.load_uint(64),
+        slice.load_coins() / 1e9,
+    )
+
+
+class WalletPluginDestruct(PayloadRecord):
+    __slots__ = ('query_id',)
+
+
+@register_decoder(0x64737472, 'wallet_plugin_destruct', WalletPluginDestruct)
+def wallet_plugin_destruct(slice):
+    return WalletPluginDestruct(slice.load_uint(64))
+
+
+class Transfer(PayloadRecord):
+    __slots__ = ('query_id', 'amount', 'recipient')
+
+
+@register_decoder(0x0ec3c86d, 'transfer', Transfer)
+def transfer(slice):
+    # Layout used by the address overview dashboard
+    return Transfer(
+        slice.load_uint(64),
+        slice.load_coins() / 1e9,
+        format_address(slice.load_address()),
+    )
+
+
+class DecodeCache:
+    # Bounded cache of decoded cells keyed by cell hash. Cells are content
+    # addressed, so a hash seen before always decodes to the same records.
+    # policy='lru' evicts the least recently used entry, policy='lfu' the
+    # least frequently used one (oldest first among equal counts).
+    # Cached lists are shared between callers and must be treated as read-only.
+
+    def __init__(self, maxsize=4096, policy='lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.clear()
+
+    def clear(self):
+        self._data = OrderedDict()  # lru: key -> value in recency order
+        self._counts = {}  # lfu: key -> use count
+        self._buckets = defaultdict(OrderedDict)  # lfu: use count -> keys in insertion order
+        self._min_count = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def _touch(self, key):
+        if self.policy == 'lru':
+            self._data.move_to_end(key)
+            return
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets[count + 1][key] = None
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key)
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        if key in self._data:
+            self._data[key] = value
+            self._touch(key)
+            return
+        if len(self._data) >= self.maxsize:
+            self._evict()
+        self._data[key] = value
+        if self.policy == 'lfu':
+            self._counts[key] = 1
+            self._buckets[1][key] = None
+            self._min_count = 1
+
+    def _evict(self):
+        if self.policy == 'lru':
+            self._data.popitem(last=False)
+            return
+        bucket = self._buckets[self._min_count]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self._buckets[self._min_count]
+        del self._counts[key]
+        del self._data[key]
+
+    def info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'policy': self.policy,
+        }
+
+
+cell_cache = DecodeCache()
+
+
+def configure_cache(maxsize=4096, policy='lru'):
+    # Replace the shared decode cache; maxsize=0 disables caching
+    global cell_cache
+    cell_cache = DecodeCache(maxsize, policy)
+    return cell_cache
+
+
+# The same few contract addresses appear in most messages, so their
+# user-friendly strings (base64 + CRC) are cached instead of rebuilt.
+address_cache = DecodeCache(maxsize=8192)
+
+
+def configure_address_cache(maxsize=8192):
+    # Replace the shared address string cache; maxsize=0 disables caching
+    global address_cache
+    address_cache = DecodeCache(maxsize)
+    return address_cache
+
+
+def format_address(address, flags=(1, 1, 1)):
+    # address.to_str(*flags), cached by workchain, raw hash and format flags.
+    # addr_none (loaded as None) stays None.
+    if address is None:
+        return None
+    if not isinstance(address, Address):
+        return address.to_str(*flags)
+    key = (address.wc, address.hash_part, flags)
+    text = address_cache.get(key)
+    if text is None:
+        text = address.to_str(*flags)
+        address_cache.put(key, text)
+    return text
+
+
+class DecodeMetrics:
+    # Opt-in decode instrumentation, installed with enable_metrics(). While no
+    # metrics object is installed the hot path only pays a None check.
+    # Subclass it and override the on_* hooks to forward events elsewhere.
+    # Each worker process of decompose_many has its own instance.
+    def __init__(self, slowest=10):
+        self.slowest = slowest
+        self.opcode_ns = defaultdict(int)
+        self.opcode_count = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.transactions = 0
+        self.transaction_ns = 0
+        self.cells_visited = 0
+        self.cells_per_tx_max = 0
+        self._slowest = []  # min-heap of (duration_ns, cell_hash)
+
+    def on_opcode(self, name, duration_ns):
+        self.opcode_ns[name] += duration_ns
+        self.opcode_count[name] += 1
+
+    def on_cell(self):
+        # Every cell walked, whether decoded or served from a cache
+        self.cells_visited += 1
 
-        # Check if the opcode is known and apply corresponding parsing technique
-        if opcode == '0x7362d09c':  # Jetton Transfer Notification
-            result.update(jetton_transfer_notif(slice))
-        
+    def on_error(self, exc):
+        self.errors[type(exc).__name__] += 1
+
+    def on_transaction(self, cell_hash, duration_ns, cells):
+        self.transactions += 1
+        self.transaction_ns += duration_ns
+        self.cells_per_tx_max = max(self.cells_per_tx_max, cells)
+        if self.slowest <= 0:
+            return
+        entry = (duration_ns, cell_hash.hex() if cell_hash else '')
+        if len(self._slowest) < self.slowest:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_transactions(self):
+        # [(cell_hash_hex, seconds)], slowest first
+        return [(cell_hash, duration_ns / 1e9) for duration_ns, cell_hash in sorted(self._slowest, reverse=True)]
+
+    def to_prometheus(self, prefix='pytontx'):
+        # Prometheus text exposition format
+        lines = [
+            f"# HELP {prefix}_opcode_decode_seconds Time spent in opcode decoders.",
+            f"# TYPE {prefix}_opcode_decode_seconds summary",
+        ]
+        for name in sorted(self.opcode_count):
+            lines.append(f'{prefix}_opcode_decode_seconds_sum{{opcode="{name}"}} {self.opcode_ns[name] / 1e9}')
+            lines.append(f'{prefix}_opcode_decode_seconds_count{{opcode="{name}"}} {self.opcode_count[name]}')
+
+        lines += [
+            f"# HELP {prefix}_transaction_decode_seconds Time spent in decompose_tx.",
+            f"# TYPE {prefix}_transaction_decode_seconds summary",
+            f"{prefix}_transaction_decode_seconds_sum {self.transaction_ns / 1e9}",
+            f"{prefix}_transaction_decode_seconds_count {self.transactions}",
+            f"# HELP {prefix}_cells_visited_total Cells walked while decoding.",
+            f"# TYPE {prefix}_cells_visited_total counter",
+            f"{prefix}_cells_visited_total {self.cells_visited}",
+            f"# HELP {prefix}_cells_per_transaction_max Most cells walked for a single transaction.",
+            f"# TYPE {prefix}_cells_per_transaction_max gauge",
+            f"{prefix}_cells_per_transaction_max {self.cells_per_tx_max}",
+            f"# HELP {prefix}_cache_hits_total Decode cache hits.",
+            f"# TYPE {prefix}_cache_hits_total counter",
+            f'{prefix}_cache_hits_total{{cache="cell"}} {cell_cache.hits}',
+            f'{prefix}_cache_hits_total{{cache="address"}} {address_cache.hits}',
+            f"# HELP {prefix}_cache_misses_total Decode cache misses.",
+            f"# TYPE {prefix}_cache_misses_total counter",
+            f'{prefix}_cache_misses_total{{cache="cell"}} {cell_cache.misses}',
+            f'{prefix}_cache_misses_total{{cache="address"}} {address_cache.misses}',
+            f"# HELP {prefix}_errors_total Decode errors by exception type.",
+            f"# TYPE {prefix}_errors_total counter",
+        ]
+        for name in sorted(self.errors):
+            lines.append(f'{prefix}_errors_total{{type="{name}"}} {self.errors[name]}')
+
+        lines += [
+            f"# HELP {prefix}_slowest_transaction_seconds Slowest decoded transactions.",
+            f"# TYPE {prefix}_slowest_transaction_seconds gauge",
+        ]
+        for cell_hash, seconds in self.slowest_transactions():
+            lines.append(f'{prefix}_slowest_transaction_seconds{{cell_hash="{cell_hash}"}} {seconds}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = None
+
+
+def enable_metrics(instance=None, slowest=10):
+    # Install `instance` (a new DecodeMetrics by default) and return it
+    global metrics
+    metrics = instance if instance is not None else DecodeMetrics(slowest)
+    return metrics
+
+
+def disable_metrics():
+    global metrics
+    metrics = None
+
+
+def decode_cell_data(slice, results):
+    # Decode the opcodes stored in the data bits of one cell into `results`
+    while len(slice.bits) >= 32:
+        # Extract opcode and look up its decoder
+        opcode = slice.load_uint(32)
+        decoder = DECODERS.get(opcode)
+
+        if decoder is not None:
+            try:
+                if metrics is None:
+                    result = decoder.decode(slice)
+                else:
+                    start = time.perf_counter_ns()
+                    result = decoder.decode(slice)
+                    metrics.on_opcode(decoder.name, time.perf_counter_ns() - start)
+            except Exception as e:
+                # Data matched a known opcode but does not follow its layout
+                if metrics is not None:
+                    metrics.on_error(e)
+                results.append(DecodeError(decoder.hex, str(e)))
+                break
+            if result is None:
+                result = UnknownOpcode(decoder.hex)
+            elif isinstance(result, dict):
+                result = GenericPayload(decoder.hex, result)
         else:
-            result['message'] = 'Unknown opcode, skipping further parsing'
+            result = UnknownOpcode(hex(opcode))
 
         results.append(result)
 
-    refs = slice.refs
-    if refs:
-        for ref in refs:
-            results.extend(unroll_cell(ref))  # Recursively unroll and collect results
 
+def walk_cells(cell, order='pre', visited=None, max_nodes=None, max_depth=None, skip=None):
+    # Iterative depth-first walk over a cell tree, yielding (cell, parent, depth)
+    # in 'pre' or 'post' order, with refs in their stored order. Uses an explicit
+    # stack, so arbitrarily deep trees never hit the recursion limit.
+    # visited: set of hashes, shared cells are then yielded once (the set is updated)
+    # max_nodes: stop after yielding this many cells
+    # max_depth: do not enter refs deeper than this (the root is depth 0)
+    # skip: hashes of subtrees that are not entered at all
+    if order not in ('pre', 'post'):
+        raise ValueError(f"Unknown walk order: {order}")
+
+    stack = [(cell, None, 0, False)]
+    count = 0
+    while stack:
+        node, parent, depth, expanded = stack.pop()
+
+        if not expanded:
+            cell_hash = node.hash
+            if skip is not None and cell_hash in skip:
+                continue
+            if visited is not None:
+                if cell_hash in visited:
+                    continue
+                visited.add(cell_hash)
+
+            if order == 'post':
+                # Yield the cell again once all of its refs are done
+                stack.append((node, parent, depth, True))
+            if max_depth is None or depth < max_depth:
+                for ref in reversed(node.refs):
+                    stack.append((ref, node, depth + 1, False))
+            if order == 'post':
+                continue
+
+        yield node, parent, depth
+        count += 1
+        if max_nodes is not None and count >= max_nodes:
+            return
+
+
+def iter_records(cell, order='pre', visited=None, max_nodes=None, max_depth=None, max_bytes=None, skip=None):
+    # Yield decoded records for every cell reached by walk_cells, in one pass.
+    # max_bytes bounds the cell data decoded; it is checked before each cell,
+    # so the last cell may overshoot it.
+    budget = max_bytes
+    for node, parent, depth in walk_cells(cell, order, visited, max_nodes, max_depth, skip):
+        if metrics is not None:
+            metrics.on_cell()
+        slice = node.begin_parse()
+        if budget is not None:
+            if budget <= 0:
+                return
+            budget -= (len(slice.bits) + 7) // 8
+
+        records = []
+        decode_cell_data(slice, records)
+        yield from records
+
+
+# Cells a shared ref is reached through are walked once per path, so a few
+# dozen cells that each reference the next one twice expand into millions of
+# nodes. Unrolls stop after this many cells by default; real transactions walk
+# a few hundred.
+MAX_UNROLL_NODES = 1 << 16
+
+
+def unroll_cell(cell, max_depth=None, max_bytes=None, skip=None, cache=True, decoded=None,
+                max_nodes=MAX_UNROLL_NODES):
+    # Decode `cell` and all of its refs in pre-order. The walk can be bounded by
+    # ref depth (`max_depth`) and by the number of data bytes decoded
+    # (`max_bytes`). Subtrees whose hash is in `skip` are not entered, and in a
+    # bounded walk each distinct cell is decoded at most once.
+    # max_nodes stops either walk after that many cells, None walks everything.
+    # cache=False neither reads nor fills the decode cache, for trees such as
+    # transaction cells whose state update, description and out_msgs nodes
+    # never repeat and would only evict the message bodies that do.
+    # decoded is a dict of cell hash -> records shared between calls: an
+    # unbounded walk reuses the cells it holds and adds the ones it decodes.
+    if max_depth is not None or max_bytes is not None or skip is not None:
+        # Bounded results depend on the limits, so they bypass the cache
+        return list(iter_records(cell, visited=set(), max_nodes=max_nodes, max_depth=max_depth,
+                                 max_bytes=max_bytes, skip=skip))
+
+    # One pre-order pass emitting the records of each cell's own data. Records
+    # are cached per cell, never per subtree, so a cell shared within the tree
+    # is decoded once and only its own records are copied wherever it appears.
+    done = decoded if decoded is not None else {}  # hash -> records of that cell
+    results = []
+    for node, parent, depth in walk_cells(cell, max_nodes=max_nodes):
+        if metrics is not None:
+            metrics.on_cell()
+        cell_hash = node.hash
+        records = done.get(cell_hash)
+        if records is None:
+            records = cell_cache.get(cell_hash) if cache else None
+            if records is None:
+                records = []
+                decode_cell_data(node.begin_parse(), records)
+                if cache:
+                    cell_cache.put(cell_hash, records)
+            done[cell_hash] = records
+        results.extend(records)
     return results
 
 
-def decompose_msg(msg):
+def message_cell_hashes(tx):
+    # Hashes of the subtrees that decompose_msg already covers: the ref holding
+    # in_msg and out_msgs, and every message body
+    hashes = {msg.body.hash for msg in [tx.in_msg, *tx.out_msgs] if msg}
+    if tx.cell.refs:
+        hashes.add(tx.cell.refs[0].hash)
+    return hashes
+
+
+class MessageRecord(Record):
+    # Decomposed message. In lazy mode the body cell is kept and only unrolled
+    # on first access to `body`, then dropped.
+    __slots__ = ('src', 'dest', 'coins', '_body', '_body_cell', '_max_nodes')
+    _fields = ('src', 'dest', 'coins', 'body')
+
+    def __init__(self, src, dest, coins, body=None, body_cell=None, max_nodes=MAX_UNROLL_NODES):
+        self.src = src
+        self.dest = dest
+        self.coins = coins
+        self._body = body
+        self._body_cell = body_cell
+        self._max_nodes = max_nodes
+
+    @property
+    def body(self):
+        if self._body_cell is not None:
+            self._body = unroll_cell(self._body_cell, max_nodes=self._max_nodes)
+            self._body_cell = None
+        return self._body
+
+
+class TransactionRecord(Record):
+    # Decomposed transaction. `tx_cell` is omitted from the mapping when the
+    # transaction cell was not unrolled, and unrolled on first access in lazy mode.
+    __slots__ = ('in_msg', 'out_msgs', 'cell_hash', '_tx_cell', '_tx_cell_root', '_has_tx_cell', '_max_nodes')
+    _fields = ('in_msg', 'out_msgs', 'tx_cell', 'cell_hash')
+
+    def __init__(self, in_msg, out_msgs, cell_hash, tx_cell=None, tx_cell_root=None, has_tx_cell=True,
+                 max_nodes=MAX_UNROLL_NODES):
+        self.in_msg = in_msg
+        self.out_msgs = out_msgs
+        self.cell_hash = cell_hash
+        self._tx_cell = tx_cell
+        self._tx_cell_root = tx_cell_root
+        self._has_tx_cell = has_tx_cell
+        self._max_nodes = max_nodes
+
+    @property
+    def tx_cell(self):
+        if self._tx_cell_root is not None:
+            self._tx_cell = unroll_cell(self._tx_cell_root, cache=False, max_nodes=self._max_nodes)
+            self._tx_cell_root = None
+        return self._tx_cell
+
+    def __getitem__(self, key):
+        if key == 'tx_cell' and not self._has_tx_cell:
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        if self._has_tx_cell:
+            return iter(self._fields)
+        return (name for name in self._fields if name != 'tx_cell')
+
+    def __len__(self):
+        return len(self._fields) - (not self._has_tx_cell)
+
+
+def decompose_msg(msg, lazy=False, decoded=None, max_nodes=MAX_UNROLL_NODES):
+    # With lazy=True the body is unrolled on first access. `decoded` and
+    # `max_nodes` are passed on to unroll_cell, see there.
     try:
         # Decompose a single message (in_msg or out_msg)
-        return {
-            'src': msg.info.src.to_str(1, 1, 1),
-            'dest': msg.info.dest.to_str(1, 1, 1),
-            'coins': msg.info.value.grams / 1e9,
-            'body': unroll_cell(msg.body)  # Unroll the body cell
-        }
+        src = format_address(msg.info.src)
+        dest = format_address(msg.info.dest)
+        coins = msg.info.value.grams / 1e9
+        if lazy:
+            return MessageRecord(src, dest, coins, body_cell=msg.body, max_nodes=max_nodes)
+        return MessageRecord(src, dest, coins, unroll_cell(msg.body, decoded=decoded, max_nodes=max_nodes))  # Unroll the body cell
     except Exception as e:
         # Handle exceptions by logging or returning a placeholder
+        if metrics is not None:
+            metrics.on_error(e)
         return {"error": str(e)}
 
-def decompose_tx(tx):
+def decompose_tx(tx, lazy=False, tx_cell=True, max_depth=None, max_bytes=None, max_nodes=MAX_UNROLL_NODES):
+    # With lazy=True message bodies and the transaction cell are only
+    # unrolled when read, for consumers that need addresses and values only.
+    # tx_cell=False leaves the transaction cell out entirely. Setting
+    # max_depth or max_bytes bounds its unroll, which then also skips the
+    # message subtrees that are already decoded under in_msg and out_msgs.
+    # Otherwise no cell is decoded twice within the transaction: message
+    # bodies and the transaction cell share the subtrees they decode.
+    # max_nodes caps the cells walked by each unroll, see MAX_UNROLL_NODES.
+    if metrics is None:
+        return _decompose_tx(tx, lazy, tx_cell, max_depth, max_bytes, max_nodes)
+
+    instance = metrics
+    start = time.perf_counter_ns()
+    cells = instance.cells_visited
+    result = _decompose_tx(tx, lazy, tx_cell, max_depth, max_bytes, max_nodes)
+    cell_hash = tx.cell.hash if getattr(tx, 'cell', None) is not None else None
+    instance.on_transaction(cell_hash, time.perf_counter_ns() - start, instance.cells_visited - cells)
+    return result
+
+
+def _decompose_tx(tx, lazy, tx_cell, max_depth, max_bytes, max_nodes):
     try:
-        # Prepare the dictionary to hold transaction details
-        tx_dict = {
-            'in_msg': decompose_msg(tx.in_msg),  # Process the incoming message
-            'out_msgs': [decompose_msg(msg) for msg in tx.out_msgs if msg],  # Process all outgoing messages
-            'tx_cell': unroll_cell(tx.cell),  # Unroll the main transaction cell
-            'cell_hash': tx.cell.hash
-        }
-        return tx_dict
+        decoded = None if lazy else {}
+        in_msg = decompose_msg(tx.in_msg, lazy, decoded, max_nodes)  # Process the incoming message
+        out_msgs = [decompose_msg(msg, lazy, decoded, max_nodes) for msg in tx.out_msgs if msg]  # Process all outgoing messages
+
+        if not tx_cell:
+            return TransactionRecord(in_msg, out_msgs, tx.cell.hash, has_tx_cell=False)
+        if max_depth is not None or max_bytes is not None:
+            # Bounded unrolls are cheap, so they are never deferred
+            bounded = unroll_cell(tx.cell, max_depth, max_bytes, message_cell_hashes(tx), max_nodes=max_nodes)
+            return TransactionRecord(in_msg, out_msgs, tx.cell.hash, bounded)
+        if lazy:
+            return TransactionRecord(in_msg, out_msgs, tx.cell.hash, tx_cell_root=tx.cell, max_nodes=max_nodes)
+        # Unroll the main transaction cell, reusing the message bodies decoded
+        # above. Only message bodies go through the decode cache.
+        unrolled = unroll_cell(tx.cell, cache=False, decoded=decoded, max_nodes=max_nodes)
+        return TransactionRecord(in_msg, out_msgs, tx.cell.hash, unrolled)
     except Exception as e:
         # Return a dictionary indicating an error with the transaction parsing
+        if metrics is not None:
+            metrics.on_error(e)
+        return {'error': f"Failed to decompose transaction: {str(e)}"}
+
+
+def decompose_boc(data, **options):
+    # Decompose a transaction serialized as BoC bytes; options go to decompose_tx,
+    # e.g. max_nodes, and so do those of decompose_many and stream_decompose
+    try:
+        tx = Transaction.deserialize(Cell.one_from_boc(data).begin_parse())
+    except Exception as e:
         return {'error': f"Failed to decompose transaction: {str(e)}"}
+    return decompose_tx(tx, **options)
+
+
+def decompose_many(txs, workers=None, chunksize=16, **options):
+    # Decompose many transactions in parallel over a process pool.
+    # `txs` may hold Transaction objects or their BoC bytes; workers receive
+    # BoC bytes only, and results come back in input order.
+    bocs = [tx if isinstance(tx, (bytes, bytearray)) else tx.cell.to_boc() for tx in txs]
+
+    if workers == 1:
+        return [decompose_boc(data, **options) for data in bocs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(decompose_boc, **options), bocs, chunksize=chunksize))
+
+
+BOC_MAGIC = bytes.fromhex('b5ee9c72')
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"Truncated BoC stream: expected {size} bytes, got {len(data)}")
+    return data
+
+
+def _read_boc(f):
+    # Read one BoC from a stream of concatenated BoCs, sizing it from its header
+    magic = f.read(4)
+    if not magic:
+        return None
+    if magic != BOC_MAGIC:
+        raise ValueError(f"Unknown BoC prefix: {magic.hex()}")
+
+    flags, off_bytes = _read_exact(f, 2)
+    has_idx = flags & 0x80
+    has_crc32c = flags & 0x40
+    size = flags & 0x07
+
+    counts = _read_exact(f, size * 3 + off_bytes)
+    cells = int.from_bytes(counts[0:size], 'big')
+    roots = int.from_bytes(counts[size:size * 2], 'big')
+    tot_cells_size = int.from_bytes(counts[size * 3:], 'big')
+
+    rest = roots * size + tot_cells_size
+    if has_idx:
+        rest += cells * off_bytes
+    if has_crc32c:
+        rest += 4
+
+    return magic + bytes((flags, off_bytes)) + counts + _read_exact(f, rest)
+
+
+def _read_prefixed_boc(f):
+    # Read one BoC preceded by its length as a big-endian uint32
+    header = f.read(4)
+    if not header:
+        return None
+    if len(header) != 4:
+        raise ValueError(f"Truncated BoC stream: expected 4 bytes, got {len(header)}")
+    return _read_exact(f, struct.unpack('>I', header)[0])
+
+
+def iter_bocs(path, framing='auto'):
+    # Yield raw transaction BoCs one at a time from a file or a directory of files.
+    # framing='concat' reads back-to-back BoCs, framing='length' reads BoCs
+    # prefixed with a 4-byte big-endian length, 'auto' picks per file.
+    path = Path(path)
+    files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+
+    for file in files:
+        with open(file, 'rb') as f:
+            file_framing = framing
+            if file_framing == 'auto':
+                file_framing = 'concat' if f.read(4) == BOC_MAGIC else 'length'
+                f.seek(0)
+            read = _read_boc if file_framing == 'concat' else _read_prefixed_boc
+
+            while True:
+                data = read(f)
+                if data is None:
+                    break
+                yield data
+
+
+def _json_default(obj):
+    # Cells, slices and hashes are written as hex so NDJSON output stays lossless
+    if isinstance(obj, Record):
+        return dict(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.hex()
+    if isinstance(obj, Slice):
+        obj = obj.to_cell()
+    if isinstance(obj, Cell):
+        return obj.to_boc().hex()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def stream_decompose(path, framing='auto', output=None, workers=None, max_pending=64, **options):
+    # Lazily decompose every transaction BoC under `path`.
+    # BoCs are read only as results are consumed, so memory stays bounded by
+    # `max_pending` in-flight transactions when decoding over `workers` processes.
+    # If `output` is a path or file object, each result is also written to it as NDJSON.
+    out = open(output, 'w') if isinstance(output, (str, os.PathLike)) else output
+    try:
+        for tx_dict in _stream_results(iter_bocs(path, framing), workers, max_pending, options):
+            if out is not None:
+                out.write(json.dumps(tx_dict, default=_json_default) + '\n')
+            yield tx_dict
+    finally:
+        if out is not None and out is not output:
+            out.close()
+
+
+def _stream_results(bocs, workers, max_pending, options):
+    if not workers:
+        for data in bocs:
+            yield decompose_boc(data, **options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for data in bocs:
+            pending.append(pool.submit(decompose_boc, data, **options))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Columnar export: one row per message, so decoded chains can be aggregated
+# with Arrow, pandas or NumPy instead of walking records in Python.
+ARROW_COLUMNS = (
+    ('cell_hash', 'binary'),
+    ('direction', 'string'),
+    ('msg_index', 'int32'),
+    ('src', 'string'),
+    ('dest', 'string'),
+    ('coins', 'float64'),
+    ('opcode', 'string'),
+    ('jetton_amount', 'float64'),
+    ('jetton_sender', 'string'),
+    ('error', 'string'),
+)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+class ArrowBatchBuilder:
+    # Collects decomposed transactions into per-column lists and turns them into
+    # Arrow record batches of `row_group_size` rows. With a `path`, every batch
+    # is written as one Parquet row group (format='parquet') or Feather/Arrow IPC
+    # record batch (format='feather'); without one, batches stay in memory for table().
+    def __init__(self, path=None, format='parquet', row_group_size=65536):
+        if format not in ('parquet', 'feather'):
+            raise ValueError(f"Unknown columnar format: {format}")
+        self.pa = _import_pyarrow()
+        self.schema = self.pa.schema([(name, getattr(self.pa, type_)()) for name, type_ in ARROW_COLUMNS])
+        self.path = path
+        self.format = format
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._columns = {name: [] for name, _ in ARROW_COLUMNS}
+        self._batches = []
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append_row(self, cell_hash, direction, msg_index, msg, error=None):
+        columns = self._columns
+        columns['cell_hash'].append(cell_hash)
+        columns['direction'].append(direction)
+        columns['msg_index'].append(msg_index)
+
+        if msg is None or 'error' in msg:
+            for name in ('src', 'dest', 'coins', 'opcode', 'jetton_amount', 'jetton_sender'):
+                columns[name].append(None)
+            columns['error'].append(error if msg is None else msg['error'])
+        else:
+            # The first body record carries the message operation
+            op = msg['body'][0] if msg['body'] else None
+            columns['src'].append(msg['src'])
+            columns['dest'].append(msg['dest'])
+            columns['coins'].append(msg['coins'])
+            columns['opcode'].append(op['opcode'] if op is not None else None)
+            columns['jetton_amount'].append(op.get('jetton_amount') if op is not None else None)
+            columns['jetton_sender'].append(op.get('jetton_sender') if op is not None else None)
+            columns['error'].append(None)
+
+        self.rows += 1
+        if len(columns['cell_hash']) >= self.row_group_size:
+            self.flush()
+
+    def add(self, tx):
+        # Add one decompose_tx result: a row for in_msg and one per out_msg
+        if 'error' in tx:
+            self._append_row(None, None, None, None, tx['error'])
+            return
+        cell_hash = tx['cell_hash']
+        self._append_row(cell_hash, 'in', 0, tx['in_msg'])
+        for index, msg in enumerate(tx['out_msgs']):
+            self._append_row(cell_hash, 'out', index, msg)
+
+    def extend(self, txs):
+        for tx in txs:
+            self.add(tx)
+
+    def flush(self):
+        if not self._columns['cell_hash']:
+            return
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array(self._columns[field.name], type=field.type) for field in self.schema],
+            schema=self.schema,
+        )
+        self._columns = {name: [] for name, _ in ARROW_COLUMNS}
+
+        if self.path is None:
+            self._batches.append(batch)
+            return
+        if self._writer is None:
+            self._writer = self._open_writer()
+        self._writer.write_batch(batch)
+
+    def _open_writer(self):
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, self.schema)
+        import pyarrow.ipc
+        return pyarrow.ipc.new_file(self.path, self.schema)
+
+    def table(self):
+        # In-memory result when no path was given
+        self.flush()
+        return self.pa.Table.from_batches(self._batches, schema=self.schema)
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# Transaction history: liteservers return at most 16 transactions per
+# getTransactions call, each page ending with the (lt, hash) cursor of the
+# next one. A background task fetches the pages one request at a time and
+# queues up to `prefetch` of them, so the next page is usually already there
+# while the caller decodes the current one. It stops once it has fetched
+# `limit` transactions, so no request is spent on pages nobody reads.
+HISTORY_PAGE_SIZE = 16
+
+
+async def iter_transactions(provider, address, limit=None, start_time=None, end_time=None,
+                            until_lt=0, from_lt=None, from_hash=None, prefetch=4):
+    # Async generator over the transactions of `address`, newest first.
+    # `provider` is anything with pytoniq's raw_get_transactions (LiteClient, LiteBalancer).
+    # Stops after `limit` transactions, at the first one older than `start_time`
+    # or at `until_lt`; transactions newer than `end_time` (unix seconds) are skipped.
+    if isinstance(address, str):
+        address = Address(address)
+    pages = asyncio.Queue(maxsize=max(1, prefetch))
+
+    async def fetch_pages():
+        lt, hash = from_lt, from_hash
+        fetched = 0  # transactions the consumer will yield, newer ones than end_time do not count
+        try:
+            while True:
+                txs, _ = await provider.raw_get_transactions(address, HISTORY_PAGE_SIZE, lt, hash)
+                await pages.put(txs)
+                if not txs:
+                    break
+                fetched += sum(1 for tx in txs if end_time is None or tx.now <= end_time)
+                if limit is not None and fetched >= limit:
+                    break
+                lt, hash = txs[-1].prev_trans_lt, txs[-1].prev_trans_hash
+                if lt == 0 or lt <= until_lt or (start_time is not None and txs[-1].now < start_time):
+                    break
+            await pages.put(None)
+        except Exception as e:
+            await pages.put(e)
+
+    producer = asyncio.create_task(fetch_pages())
+    count = 0
+    try:
+        while limit is None or count < limit:
+            page = await pages.get()
+            if page is None:
+                return
+            if isinstance(page, Exception):
+                raise page
+            for tx in page:
+                if tx.lt <= until_lt or (start_time is not None and tx.now < start_time):
+                    return
+                if end_time is not None and tx.now > end_time:
+                    continue
+                yield tx
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        producer.cancel()
+
+
+async def main():
+    provider = LiteBalancer.from_mainnet_config(n)
+    await provider.start_up()
+
+    txs = [tx async for tx in iter_transactions(provider, address, limit=k)] # get transactions for wallet
+    for tx_dict in decompose_many(txs):
+        print(tx_dict)
+
+    await provider.close_all()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+import pytest
+from pytoniq_core import Cell, Transaction
+
+# pytontx lives at the repository root, the innerlabs apps import their
+# modules by name from their own directories
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / 'innerlabs' / 'address_overview', ROOT / 'innerlabs' / 'dashboard'):
+    sys.path.insert(0, str(path))
+
+FIXTURES_DIR = ROOT / 'benchmarks' / 'fixtures'
+
+
+@pytest.fixture
+def corpus():
+    # Transactions of one benchmark corpus, fixtures/<name>.boc
+    from pytontx import iter_bocs
+
+    def load(name):
+        return [Transaction.deserialize(Cell.one_from_boc(data).begin_parse())
+                for data in iter_bocs(FIXTURES_DIR / f'{name}.boc')]
+    return load
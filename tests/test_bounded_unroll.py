@@ -0,0 +1,25 @@
+from pytontx import JettonTransferNotification, JettonTransfer, decompose_tx
+
+
+def test_bounded_tx_cell_skips_message_subtrees(corpus):
+    tx = corpus('synthetic_jetton_notifications')[0]
+    full = decompose_tx(tx)['tx_cell']
+    bounded = decompose_tx(tx, max_depth=64)['tx_cell']
+    assert any(isinstance(record, JettonTransferNotification) for record in full)
+    assert not any(isinstance(record, JettonTransferNotification) for record in bounded)
+    assert len(bounded) < len(full)
+
+
+def test_max_bytes_and_max_depth_bound_the_walk(corpus):
+    tx = corpus('synthetic_fan_out')[0]
+    assert decompose_tx(tx, max_depth=0)['tx_cell'] == decompose_tx(tx, max_bytes=1)['tx_cell']
+    assert len(decompose_tx(tx, max_depth=1)['tx_cell']) <= len(decompose_tx(tx, max_depth=64)['tx_cell'])
+    assert not any(isinstance(record, JettonTransfer) for record in decompose_tx(tx, max_depth=64)['tx_cell'])
+
+
+def test_tx_cell_false_leaves_it_out(corpus):
+    tx = corpus('synthetic_fan_out')[0]
+    record = decompose_tx(tx, tx_cell=False)
+    assert 'tx_cell' not in record
+    assert list(record) == ['in_msg', 'out_msgs', 'cell_hash']
+    assert record['out_msgs'] == decompose_tx(tx)['out_msgs']
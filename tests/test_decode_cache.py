@@ -0,0 +1,75 @@
+import pytest
+from pytontx import DecodeCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = DecodeCache(maxsize=2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    assert cache.get('a') == [1]
+    assert cache.get('c') == [3]
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = DecodeCache(maxsize=2, policy='lfu')
+    cache.put('a', [1])
+    cache.put('b', [2])
+    cache.get('a')
+    cache.get('a')
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    assert cache.get('a') == [1]
+    assert cache.get('c') == [3]
+
+
+def test_lfu_evicts_oldest_among_equal_counts():
+    cache = DecodeCache(maxsize=3, policy='lfu')
+    for key in 'abc':
+        cache.put(key, [key])
+    cache.get('a')
+    cache.get('b')
+    # b and a now have 2 uses, c only 1
+    cache.put('d', ['d'])
+    assert cache.get('c') is None
+    # d has 1 use and is the only key at the minimum count
+    cache.put('e', ['e'])
+    assert cache.get('d') is None
+    assert len(cache) == 3
+
+
+def test_lfu_put_existing_key_counts_as_use():
+    cache = DecodeCache(maxsize=2, policy='lfu')
+    cache.put('a', [1])
+    cache.put('b', [2])
+    cache.put('a', [10])
+    cache.put('c', [3])
+    assert cache.get('a') == [10]
+    assert cache.get('b') is None
+
+
+def test_lfu_keeps_min_count_after_eviction():
+    cache = DecodeCache(maxsize=2, policy='lfu')
+    cache.put('a', [1])
+    for _ in range(3):
+        cache.get('a')
+    cache.put('b', [2])
+    cache.put('c', [3])  # evicts b, the only key used once
+    cache.put('d', [4])  # evicts c, not a
+    assert cache.get('a') == [1]
+    assert cache.get('c') is None
+    assert cache.get('d') == [4]
+
+
+def test_counters_and_disabled_cache():
+    cache = DecodeCache(maxsize=0)
+    cache.put('a', [1])
+    assert cache.get('a') is None
+    assert cache.info() == {'hits': 0, 'misses': 1, 'size': 0, 'maxsize': 0, 'policy': 'lru'}
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        DecodeCache(policy='fifo')
@@ -0,0 +1,56 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from decoding import DecodeStage, decode_transactions
+
+
+def test_small_request_is_not_queued_behind_a_long_refresh(corpus):
+    txs = corpus('synthetic_fan_out')[:2]
+
+    async def run():
+        stage = DecodeStage(processes=0)
+        finished = []
+        try:
+            # A long refresh submits ten pages, then a small request its first one
+            futures = [stage.submit(txs, position) for position in range(0, 160, 16)]
+            small = stage.submit(txs[:1], 0)
+            for name, future in [('small', small)] + [(position, future) for position, future in zip(range(0, 160, 16), futures)]:
+                future.add_done_callback(lambda _, name=name: finished.append(name))
+            await asyncio.gather(small, *futures)
+        finally:
+            stage.close()
+        return finished, small.result(), futures[0].result()
+
+    finished, small, first = asyncio.run(run())
+    assert finished.index('small') < finished.index(144)
+    assert small == decode_transactions(txs[:1])
+    assert first == decode_transactions(txs)
+
+
+class RecordingPool(ThreadPoolExecutor):
+    # Stands in for the process pool, remembering what was sent to it
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append(fn.__name__)
+        return super().submit(fn, *args)
+
+
+def test_long_refreshes_move_to_the_process_pool(corpus):
+    txs = corpus('synthetic_jetton_notifications')[:4]
+
+    async def run():
+        stage = DecodeStage(processes=0, process_threshold=4)
+        stage._processes = pool = RecordingPool()
+        try:
+            on_thread = await stage.submit(txs, 0)
+            assert pool.calls == []
+            on_pool = await stage.submit(txs, 4)
+            assert pool.calls == ['decode_bocs']
+            return on_thread, on_pool
+        finally:
+            stage.close()
+
+    on_thread, on_pool = asyncio.run(run())
+    assert on_pool == on_thread == decode_transactions(txs)
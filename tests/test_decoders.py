@@ -0,0 +1,155 @@
+import pytest
+from pytoniq_core import Address, begin_cell
+from pytontx import DECODERS, DecodeError, TextComment, UnknownOpcode, unroll_cell
+
+SENDER = Address((0, bytes([1]) * 32))
+RECIPIENT = Address((0, bytes([2]) * 32))
+
+
+def friendly(address):
+    return address.to_str(1, 1, 1)
+
+
+def decode(builder):
+    return unroll_cell(builder.end_cell(), cache=False)
+
+
+def comment(text):
+    return begin_cell().store_uint(0, 32).store_snake_string(text).end_cell()
+
+
+def op(opcode, query_id=7):
+    return begin_cell().store_uint(opcode, 32).store_uint(query_id, 64)
+
+
+def test_every_opcode_has_a_test():
+    tested = {
+        0x0f8a7ea5, 0x7362d09c, 0x178d4519, 0xd53276db, 0x595f07bc, 0x7bdd97de, 0x5fcc3d14,
+        0x05138d91, 0x2fcb26a2, 0x8b771735, 0x00000000, 0x706c7567, 0x64737472, 0x0ec3c86d,
+    }
+    assert set(DECODERS) == tested
+
+
+def test_jetton_transfer_with_addr_none_and_ref_payload():
+    payload = comment("hi")
+    record, forward = decode(
+        op(0x0f8a7ea5).store_coins(3 * 10**9).store_address(RECIPIENT).store_address(None)
+        .store_maybe_ref(None).store_coins(10**6).store_bit(1).store_ref(payload)
+    )
+    assert record.to_dict() == {
+        'opcode': '0xf8a7ea5', 'query_id': 7, 'jetton_amount': 3.0, 'destination': friendly(RECIPIENT),
+        'response_destination': None, 'custom_payload': None, 'forward_ton_amount': 0.001,
+        'forward_payload': payload,
+    }
+    # The walk also decodes the forward payload cell itself
+    assert forward == TextComment("hi")
+
+
+def test_jetton_transfer_inline_payload():
+    [record] = decode(
+        op(0x0f8a7ea5).store_coins(1).store_address(RECIPIENT).store_address(SENDER)
+        .store_maybe_ref(None).store_coins(0).store_bit(0).store_uint(0xabcd, 16)
+    )
+    assert record['response_destination'] == friendly(SENDER)
+    assert record['forward_payload'].begin_parse().load_uint(16) == 0xabcd
+
+
+def test_jetton_transfer_without_payload():
+    [record] = decode(
+        op(0x0f8a7ea5).store_coins(1).store_address(RECIPIENT).store_address(SENDER)
+        .store_maybe_ref(None).store_coins(0).store_bit(0)
+    )
+    assert record['forward_payload'] is None
+
+
+def test_jetton_notification():
+    records = decode(
+        op(0x7362d09c).store_coins(5 * 10**9).store_address(SENDER).store_bit(1).store_ref(comment("order"))
+    )
+    assert records[0]['jetton_amount'] == 5.0
+    assert records[0]['jetton_sender'] == friendly(SENDER)
+    assert records[1]['comment'] == "order"
+
+
+def test_truncated_jetton_notification_keeps_missing_fields_none():
+    [record] = decode(op(0x7362d09c))
+    assert record['query_id'] == 7
+    assert record['jetton_amount'] is None
+    assert record['jetton_sender'] is None
+    assert record['forward_payload'] is None
+
+
+def test_jetton_internal_transfer():
+    [record] = decode(
+        op(0x178d4519).store_coins(10**9).store_address(SENDER).store_address(None).store_coins(0).store_bit(0)
+    )
+    assert record['from'] == friendly(SENDER)
+    assert record['response_address'] is None
+    assert list(record) == ['opcode', 'query_id', 'jetton_amount', 'from', 'response_address',
+                            'forward_ton_amount', 'forward_payload']
+
+
+def test_excesses_and_static_data_queries():
+    assert decode(op(0xd53276db, 9))[0].to_dict() == {'opcode': '0xd53276db', 'query_id': 9}
+    assert decode(op(0x2fcb26a2, 9))[0].to_dict() == {'opcode': '0x2fcb26a2', 'query_id': 9}
+    assert decode(op(0x64737472, 9))[0].to_dict() == {'opcode': '0x64737472', 'query_id': 9}
+
+
+def test_jetton_burn_and_notification():
+    [burn] = decode(op(0x595f07bc).store_coins(2 * 10**9).store_address(SENDER).store_maybe_ref(None))
+    assert (burn['jetton_amount'], burn['response_destination'], burn['custom_payload']) == (2.0, friendly(SENDER), None)
+    [notification] = decode(op(0x7bdd97de).store_coins(10**9).store_address(SENDER).store_address(None))
+    assert (notification['sender'], notification['response_destination']) == (friendly(SENDER), None)
+
+
+def test_nft_messages():
+    [transfer] = decode(
+        op(0x5fcc3d14).store_address(RECIPIENT).store_address(None).store_maybe_ref(None)
+        .store_coins(10**6).store_bit(0)
+    )
+    assert transfer['new_owner'] == friendly(RECIPIENT)
+    assert transfer['response_destination'] is None
+    assert transfer['forward_payload'] is None
+
+    [assigned] = decode(op(0x05138d91).store_address(SENDER).store_bit(0).store_uint(1, 8))
+    assert assigned['prev_owner'] == friendly(SENDER)
+    assert assigned['forward_payload'].begin_parse().load_uint(8) == 1
+
+    [report] = decode(op(0x8b771735).store_uint(42, 256).store_address(RECIPIENT))
+    assert (report['index'], report['collection']) == (42, friendly(RECIPIENT))
+
+
+def test_wallet_plugin_request_funds():
+    [record] = decode(op(0x706c7567).store_coins(10**9))
+    assert record['amount'] == 1.0
+
+
+def test_transfer_recipient_uses_default_format():
+    [record] = decode(op(0x0ec3c86d).store_coins(10**9).store_address(RECIPIENT))
+    assert record['recipient'] == friendly(RECIPIENT)
+
+
+def test_text_comment():
+    assert decode(begin_cell().store_uint(0, 32).store_snake_string("gm")) == [TextComment("gm")]
+    assert decode(begin_cell().store_uint(0, 32)) == [TextComment("")]
+
+
+@pytest.mark.parametrize('builder', [
+    # Zero word followed by hash-like data, e.g. in a state update
+    lambda: begin_cell().store_uint(0, 32).store_uint(0x42, 32).store_bytes(bytes(16)),
+    # Not byte-aligned
+    lambda: begin_cell().store_uint(0, 32).store_uint(1, 3),
+    # Not UTF-8
+    lambda: begin_cell().store_uint(0, 32).store_bytes(b'\xff\xfe'),
+])
+def test_text_comment_rejects_zero_words(builder):
+    records = decode(builder())
+    assert records[0] == UnknownOpcode('0x0')
+    assert not any(isinstance(record, (TextComment, DecodeError)) for record in records)
+
+
+def test_unknown_opcode_and_layout_errors():
+    assert decode(begin_cell().store_uint(0x12345678, 32)) == [UnknownOpcode('0x12345678')]
+    [error] = decode(begin_cell().store_uint(0x0f8a7ea5, 32).store_uint(1, 8))
+    assert isinstance(error, DecodeError)
+    assert error['opcode'] == '0xf8a7ea5'
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from pytoniq_core import Address
+from pytontx import iter_transactions
+
+ADDRESS = Address((0, bytes(32)))
+
+
+class FakeProvider:
+    # Account with `total` transactions at lt 1..total, one per second
+    def __init__(self, total=1000, fail_at=None):
+        self.total = total
+        self.fail_at = fail_at
+        self.calls = 0
+
+    async def raw_get_transactions(self, address, count, lt, hash):
+        self.calls += 1
+        if self.calls == self.fail_at:
+            raise ConnectionError("liteserver gone")
+        start = self.total if lt is None else lt
+        txs = [
+            SimpleNamespace(lt=lt_, now=lt_, prev_trans_lt=lt_ - 1, prev_trans_hash=b'')
+            for lt_ in range(start, max(0, start - count), -1)
+        ]
+        await asyncio.sleep(0)
+        return txs, None
+
+
+def collect(provider, **kwargs):
+    async def run():
+        txs = [tx.lt async for tx in iter_transactions(provider, ADDRESS, **kwargs)]
+        # Let a producer that is still running make its next call
+        await asyncio.sleep(0.01)
+        return txs
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('limit, calls', [(1, 1), (16, 1), (17, 2), (100, 7)])
+def test_stops_fetching_at_limit(limit, calls):
+    provider = FakeProvider()
+    assert collect(provider, limit=limit) == list(range(1000, 1000 - limit, -1))
+    assert provider.calls == calls
+
+
+def test_pages_through_the_whole_history():
+    provider = FakeProvider(total=40)
+    assert collect(provider) == list(range(40, 0, -1))
+    assert provider.calls == 3
+
+
+def test_time_and_lt_bounds():
+    assert collect(FakeProvider(), until_lt=990) == list(range(1000, 990, -1))
+    assert collect(FakeProvider(), start_time=995) == list(range(1000, 994, -1))
+    # Newer transactions are skipped and do not count towards the limit
+    provider = FakeProvider()
+    assert collect(provider, end_time=990, limit=16) == list(range(990, 974, -1))
+    assert provider.calls == 2
+
+
+def test_provider_errors_reach_the_consumer():
+    with pytest.raises(ConnectionError):
+        collect(FakeProvider(fail_at=2), limit=100)
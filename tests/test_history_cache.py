@@ -0,0 +1,80 @@
+from history_cache import AddressHistory, MemoryBackend, SQLiteBackend
+
+CONTRACT = "EQcontract"
+
+
+def tx(lt, *wallets):
+    # One incoming message from each wallet
+    return {"lt": lt, "details": [{"direction": "Incoming", "address": wallet, "data": {}} for wallet in wallets]}
+
+
+def test_merge_counts_new_transactions():
+    history = AddressHistory(CONTRACT, limit=10)
+    history.merge([tx(2, "a", "b"), tx(1, "a", CONTRACT, "None")])
+    assert history.last_lt == 2
+    assert history.wallets == {"a": {"in": 2, "out": 0}, "b": {"in": 1, "out": 0}}
+
+
+def test_merge_evicts_oldest_and_their_counts():
+    history = AddressHistory(CONTRACT, limit=2)
+    history.merge([tx(2, "a"), tx(1, "b")])
+    history.merge([tx(4, "c"), tx(3, "a")])
+    assert [t["lt"] for t in history.transactions] == [4, 3]
+    # b left the history, a is counted once from lt 3 only
+    assert history.wallets == {"a": {"in": 1, "out": 0}, "c": {"in": 1, "out": 0}}
+
+
+def test_merge_without_new_transactions_only_marks_checked():
+    history = AddressHistory(CONTRACT, limit=2, last_lt=5, transactions=[tx(5, "a")], wallets={"a": {"in": 1, "out": 0}})
+    history.merge([])
+    assert history.last_lt == 5
+    assert history.checked_at > 0
+    assert history.wallets == {"a": {"in": 1, "out": 0}}
+
+
+def test_view_shorter_than_history_recounts():
+    history = AddressHistory(CONTRACT, limit=3)
+    history.merge([tx(3, "a"), tx(2, "b"), tx(1, "a")])
+    wallets, details = history.view(2)
+    assert wallets == {"a": {"in": 1, "out": 0}, "b": {"in": 1, "out": 0}}
+    assert len(details) == 2
+    assert history.view(3)[0] == history.wallets
+
+
+def test_from_dict_does_not_share_counts_with_backend():
+    backend = MemoryBackend()
+    history = AddressHistory(CONTRACT, limit=2)
+    history.merge([tx(1, "a")])
+    backend.set(CONTRACT, history.to_dict())
+
+    restored = AddressHistory.from_dict(CONTRACT, backend.get(CONTRACT))
+    restored.merge([tx(3, "b"), tx(2, "a")])
+    assert backend.get(CONTRACT)["wallets"] == {"a": {"in": 1, "out": 0}}
+    assert backend.get(CONTRACT)["transactions"] == [tx(1, "a")]
+
+
+def test_memory_backend_expires_and_evicts():
+    backend = MemoryBackend(maxsize=2, ttl=None)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+
+    expired = MemoryBackend(ttl=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+def test_sqlite_backend_round_trip(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "history.db"))
+    history = AddressHistory(CONTRACT, limit=2)
+    history.merge([tx(1, "a")])
+    backend.set(CONTRACT, history.to_dict())
+    restored = AddressHistory.from_dict(CONTRACT, backend.get(CONTRACT))
+    assert restored.wallets == history.wallets
+    assert restored.last_lt == 1
+    backend.delete(CONTRACT)
+    assert backend.get(CONTRACT) is None
+    backend.close()
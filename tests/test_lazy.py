@@ -0,0 +1,21 @@
+import pytest
+from pytontx import decompose_msg, decompose_tx
+
+
+@pytest.mark.parametrize('name', ['synthetic_wallet_transfers', 'synthetic_jetton_notifications', 'synthetic_fan_out'])
+def test_lazy_records_equal_eager_ones(corpus, name):
+    for tx in corpus(name):
+        assert decompose_tx(tx, lazy=True) == decompose_tx(tx)
+
+
+def test_lazy_body_is_decoded_on_first_access(corpus):
+    tx = corpus('synthetic_jetton_notifications')[0]
+    record = decompose_msg(tx.in_msg, lazy=True)
+    assert record._body_cell is not None
+    assert record.body == decompose_msg(tx.in_msg).body
+    assert record._body_cell is None
+
+    lazy = decompose_tx(tx, lazy=True)
+    assert lazy._tx_cell_root is not None
+    assert lazy['tx_cell'] == decompose_tx(tx)['tx_cell']
+    assert lazy._tx_cell_root is None
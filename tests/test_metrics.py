@@ -0,0 +1,40 @@
+import pytest
+from pytoniq_core import begin_cell
+import pytontx
+
+
+@pytest.fixture
+def metrics():
+    pytontx.configure_cache()
+    yield pytontx.enable_metrics()
+    pytontx.disable_metrics()
+    pytontx.configure_cache()
+
+
+def body():
+    forward = begin_cell().store_uint(0, 32).store_snake_string("hello").end_cell()
+    return (
+        begin_cell()
+        .store_uint(0xd53276db, 32).store_uint(1, 64)
+        .store_ref(forward)
+        .end_cell()
+    )
+
+
+def test_cells_visited_counts_walked_cells_in_every_path(metrics):
+    cell = body()
+    pytontx.unroll_cell(cell)
+    assert metrics.cells_visited == 2
+    # Served from the decode cache, still walked
+    pytontx.unroll_cell(cell)
+    assert metrics.cells_visited == 4
+    pytontx.unroll_cell(cell, max_depth=5)
+    assert metrics.cells_visited == 6
+
+
+def test_opcodes_and_prometheus_export(metrics):
+    pytontx.unroll_cell(body())
+    assert metrics.opcode_count == {'excesses': 1, 'text_comment': 1}
+    text = metrics.to_prometheus()
+    assert 'pytontx_cells_visited_total 2' in text
+    assert 'pytontx_opcode_decode_seconds_count{opcode="excesses"} 1' in text
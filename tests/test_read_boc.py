@@ -0,0 +1,44 @@
+import io
+import struct
+import pytest
+from pytoniq_core import begin_cell
+from pytontx import _read_boc, iter_bocs
+
+
+def chain(length, value):
+    cell = begin_cell().store_uint(value, 32).end_cell()
+    for i in range(length - 1):
+        cell = begin_cell().store_uint(i, 32).store_ref(cell).end_cell()
+    return cell
+
+
+BOCS = [
+    chain(1, 1).to_boc(),
+    chain(3, 2).to_boc(has_idx=True),
+    chain(5, 3).to_boc(hash_crc32=True),
+    chain(4, 4).to_boc(has_idx=True, hash_crc32=True),
+    # Over 255 cells, so cell counts take two bytes
+    chain(300, 5).to_boc(has_idx=True, hash_crc32=True),
+]
+
+
+def test_reads_back_to_back_bocs():
+    stream = io.BytesIO(b''.join(BOCS))
+    assert [_read_boc(stream) for _ in BOCS] == BOCS
+    assert _read_boc(stream) is None
+
+
+def test_truncated_boc():
+    with pytest.raises(ValueError, match='Truncated'):
+        _read_boc(io.BytesIO(BOCS[1][:-1]))
+
+
+def test_unknown_prefix():
+    with pytest.raises(ValueError, match='Unknown BoC prefix'):
+        _read_boc(io.BytesIO(b'\x00' * 16))
+
+
+def test_iter_bocs_detects_framing(tmp_path):
+    (tmp_path / 'concat.boc').write_bytes(b''.join(BOCS))
+    (tmp_path / 'length.boc').write_bytes(b''.join(struct.pack('>I', len(data)) + data for data in BOCS))
+    assert list(iter_bocs(tmp_path)) == BOCS + BOCS
@@ -0,0 +1,35 @@
+import json
+from pytoniq_core import begin_cell
+from pytontx import JettonInternalTransfer, MessageRecord, TransactionRecord, decompose_tx
+
+
+def test_record_reads_like_a_dict():
+    record = JettonInternalTransfer(1, 2.0, 'from-address', None, 0.0, None)
+    assert record['from'] == 'from-address'
+    assert dict(record)['opcode'] == '0x178d4519'
+    assert record == {'opcode': '0x178d4519', 'query_id': 1, 'jetton_amount': 2.0, 'from': 'from-address',
+                      'response_address': None, 'forward_ton_amount': 0.0, 'forward_payload': None}
+    assert not hasattr(record, '__dict__')
+
+
+def test_to_dict_converts_nested_records():
+    body = begin_cell().store_uint(0xd53276db, 32).store_uint(5, 64).end_cell()
+    message = MessageRecord('src', 'dest', 1.5, body_cell=body)
+    record = TransactionRecord(message, [message], b'\x01', tx_cell=[])
+    plain = record.to_dict()
+    assert type(plain['in_msg']) is dict
+    assert type(plain['in_msg']['body'][0]) is dict
+    assert plain['out_msgs'][0] == {'src': 'src', 'dest': 'dest', 'coins': 1.5,
+                                    'body': [{'opcode': '0xd53276db', 'query_id': 5}]}
+
+
+def test_to_json_round_trip(corpus):
+    tx = corpus('synthetic_fan_out')[0]
+    record = decompose_tx(tx)
+    data = json.loads(record.to_json())
+    assert data['cell_hash'] == tx.cell.hash.hex()
+    # Payload cells are written as BoC hex
+    payload = record['out_msgs'][0]['body'][0]['forward_payload']
+    assert data['out_msgs'][0]['body'][0]['forward_payload'] == payload.to_boc().hex()
+    assert data['in_msg']['src'] == record['in_msg']['src']
+    assert len(data['tx_cell']) == len(record['tx_cell'])
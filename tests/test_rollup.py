@@ -0,0 +1,53 @@
+import datetime
+from rollup import RollingStats
+
+NOW = datetime.datetime(2024, 1, 2, 12, 0, 30)
+
+
+def trade(ticker, price, amount, minutes_ago):
+    return {'ticker': ticker, 'price': price, 'amount': amount,
+            'timestamp_dt': NOW - datetime.timedelta(minutes=minutes_ago)}
+
+
+def test_statistics_over_the_window():
+    stats = RollingStats()
+    stats.add(trade('A', 10, 1, 30))
+    stats.add(trade('A', 12, 3, 10))
+    stats.add(trade('A', 11, 2, 10))
+    row = stats.statistics(NOW).set_index('ticker').loc['A']
+    assert row['total_volume'] == 6
+    assert row['number_of_trades'] == 3
+    assert row['first_price'] == 10
+    assert row['last_price'] == 11
+    assert row['price_change_percentage'] == 10
+
+
+def test_evict_drops_expired_buckets_from_totals():
+    stats = RollingStats()
+    stats.add(trade('A', 10, 5, 25 * 60))
+    stats.add(trade('A', 20, 1, 23 * 60))
+    stats.add(trade('B', 30, 1, 26 * 60))
+    stats.evict(NOW)
+    rows = stats.statistics(NOW)
+    assert rows['ticker'].tolist() == ['A']
+    row = rows.iloc[0]
+    assert row['total_volume'] == 1
+    assert row['number_of_trades'] == 1
+    assert row['first_price'] == 20
+
+
+def test_evict_keeps_the_minute_at_the_window_start():
+    stats = RollingStats()
+    # Same minute as NOW - 24h, so still inside the window
+    stats.add(trade('A', 10, 1, 24 * 60))
+    stats.evict(NOW)
+    assert stats.statistics(NOW)['number_of_trades'].tolist() == [1]
+    stats.evict(NOW + datetime.timedelta(minutes=1))
+    assert stats.statistics(NOW + datetime.timedelta(minutes=1)).empty
+
+
+def test_trades_without_timestamp_or_price_are_ignored():
+    stats = RollingStats()
+    stats.add({'ticker': 'A', 'price': None, 'amount': 1, 'timestamp_dt': NOW})
+    stats.add({'ticker': 'A', 'price': 1, 'amount': 1})
+    assert stats.statistics(NOW).empty
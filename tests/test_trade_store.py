@@ -0,0 +1,63 @@
+import numpy as np
+from trade_store import TradeRing, TradeStore, NO_TIMESTAMP, parse_trades
+
+
+def batch(ts):
+    ts = np.asarray(ts, 'i8')
+    return {'ts': ts, 'price': ts * 1.0, 'amount': np.ones(len(ts)), 'side': np.zeros(len(ts), 'i1')}
+
+
+def test_ring_before_wrap():
+    ring = TradeRing(capacity=4)
+    assert ring.last_ts == NO_TIMESTAMP
+    ring.extend(batch([1, 2, 3]))
+    assert len(ring) == 3
+    assert ring.columns()['ts'].tolist() == [1, 2, 3]
+    assert ring.last_ts == 3
+
+
+def test_ring_wraparound_keeps_latest_in_order():
+    ring = TradeRing(capacity=4)
+    ring.extend(batch([1, 2, 3]))
+    ring.extend(batch([4, 5, 6]))
+    assert len(ring) == 4
+    columns = ring.columns()
+    assert columns['ts'].tolist() == [3, 4, 5, 6]
+    assert columns['price'].tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert ring.last_ts == 6
+
+
+def test_ring_batch_larger_than_capacity():
+    ring = TradeRing(capacity=3)
+    ring.extend(batch([1]))
+    ring.extend(batch([2, 3, 4, 5, 6]))
+    assert ring.columns()['ts'].tolist() == [4, 5, 6]
+    assert ring.last_ts == 6
+
+
+def test_store_adds_only_newer_trades():
+    store = TradeStore(capacity=5)
+    assert store.add('A', batch([1, 2, 3])) == 3
+    assert store.add('A', batch([2, 3, 4])) == 1
+    assert store.last_ts('A') == 4
+    assert store.last_ts('B') == NO_TIMESTAMP
+
+
+def test_frame_is_newest_first_across_tickers():
+    store = TradeStore(capacity=2)
+    store.add('A', batch([1, 4, 5]))
+    store.add('B', batch([2, 3]))
+    frame = store.frame()
+    assert frame['ts'].tolist() == [5, 4, 3, 2]
+    assert frame['ticker'].tolist() == ['A', 'A', 'B', 'B']
+    assert TradeStore().frame().empty
+
+
+def test_parse_trades_sorts_and_drops_bad_timestamps():
+    columns = parse_trades([
+        {'price': '2', 'amount': '1', 'side': 'sell', 'orderTime': '2024-01-01T00:00:02.000Z'},
+        {'price': '1', 'amount': '1', 'side': 'buy', 'orderTime': '2024-01-01T00:00:01.000Z'},
+        {'price': '3', 'amount': '1', 'side': 'buy', 'orderTime': 'not a time'},
+    ])
+    assert columns['price'].tolist() == [1.0, 2.0]
+    assert columns['side'].tolist() == [0, 1]
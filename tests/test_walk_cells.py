@@ -0,0 +1,81 @@
+import sys
+import pytest
+from pytoniq_core import begin_cell
+from pytontx import MAX_UNROLL_NODES, unroll_cell, walk_cells
+
+EXCESSES = 0xd53276db
+
+
+def excesses(query_id, *refs):
+    builder = begin_cell().store_uint(EXCESSES, 32).store_uint(query_id, 64)
+    for ref in refs:
+        builder.store_ref(ref)
+    return builder.end_cell()
+
+
+def shared_ref_dag(levels):
+    # Every cell references the next one twice: `levels` unique cells, 2**levels - 1 paths
+    cell = excesses(0)
+    for i in range(1, levels):
+        cell = excesses(i, cell, cell)
+    return cell
+
+
+def chain(length):
+    cell = excesses(0)
+    for i in range(1, length):
+        cell = excesses(i, cell)
+    return cell
+
+
+@pytest.fixture
+def low_recursion_limit():
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    yield
+    sys.setrecursionlimit(limit)
+
+
+def test_tree():
+    # a -> (b -> d, c)
+    d = excesses(4)
+    b = excesses(2, d)
+    c = excesses(3)
+    a = excesses(1, b, c)
+    names = {a.hash: 'a', b.hash: 'b', c.hash: 'c', d.hash: 'd'}
+
+    def walk(**kwargs):
+        return [(names[node.hash], depth) for node, parent, depth in walk_cells(a, **kwargs)]
+
+    assert walk() == [('a', 0), ('b', 1), ('d', 2), ('c', 1)]
+    assert walk(order='post') == [('d', 2), ('b', 1), ('c', 1), ('a', 0)]
+    assert walk(max_depth=1) == [('a', 0), ('b', 1), ('c', 1)]
+    assert walk(max_nodes=2) == [('a', 0), ('b', 1)]
+    assert walk(skip={b.hash}) == [('a', 0), ('c', 1)]
+    with pytest.raises(ValueError):
+        walk(order='level')
+
+
+def test_visited_yields_shared_cells_once():
+    dag = shared_ref_dag(5)
+    assert sum(1 for _ in walk_cells(dag)) == 2 ** 5 - 1
+    visited = set()
+    assert sum(1 for _ in walk_cells(dag, visited=visited)) == 5
+    assert len(visited) == 5
+
+
+def test_unroll_caps_shared_ref_dag():
+    # 21 unique cells expand into over a million paths
+    dag = shared_ref_dag(21)
+    assert len(unroll_cell(dag, cache=False)) == MAX_UNROLL_NODES
+    assert len(unroll_cell(dag, cache=False, max_nodes=100)) == 100
+    assert len(unroll_cell(shared_ref_dag(8), cache=False, max_nodes=None)) == 2 ** 8 - 1
+    # A bounded walk decodes every distinct cell once
+    assert len(unroll_cell(dag, max_depth=30)) == 21
+
+
+def test_deep_chain_without_recursion(low_recursion_limit):
+    cell = chain(1000)
+    records = unroll_cell(cell, cache=False)
+    assert [record['query_id'] for record in records] == list(range(999, -1, -1))
+    assert len(list(walk_cells(cell, order='post'))) == 1000